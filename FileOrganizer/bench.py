@@ -0,0 +1,258 @@
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+from dedupe import DUPLICATE_POLICIES
+from engine import MASTER_EXTENSION_MAP, OrganizerEngine
+from journal import UndoJournal
+from scanner import TreeWalker
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Filesystem calls CPython reports through audit hooks. stat() and DirEntry
+# lookups are not audited, so fs_calls_per_file is a lower bound on syscalls.
+AUDITED_FS_EVENTS = {
+    "open",
+    "os.scandir",
+    "os.listdir",
+    "os.rename",
+    "os.link",
+    "os.remove",
+    "os.rmdir",
+    "os.mkdir",
+    "os.truncate",
+    "shutil.copyfile",
+}
+DEFAULT_MIX = {ext: 1 for ext in MASTER_EXTENSION_MAP} | {".xyz": 2, "": 1}
+
+
+class _CallCounter:
+    def __init__(self):
+        self.calls = 0
+        self.enabled = False
+        sys.addaudithook(self._hook)
+
+    def _hook(self, event: str, _args) -> None:
+        if self.enabled and event in AUDITED_FS_EVENTS:
+            self.calls += 1
+
+
+def parse_mix(text: str) -> dict[str, float]:
+    """``".pdf=3,.jpg=1,=1"``: extension weights, an empty extension means none."""
+    mix = {}
+    for item in text.split(","):
+        ext, _, weight = item.strip().partition("=")
+        mix[ext.strip().lower()] = float(weight or 1)
+    return mix
+
+
+def generate_corpus(
+    root: str,
+    files: int,
+    *,
+    mix: dict[str, float] | None = None,
+    depth: int = 0,
+    fanout: int = 4,
+    collision_rate: float = 0.0,
+    file_size: int = 64,
+    seed: int = 0,
+) -> list[str]:
+    """Create ``files`` files under ``root`` and return the folders used.
+
+    Files are spread over a tree ``depth`` levels deep with ``fanout``
+    subfolders per level. A ``collision_rate`` share of files reuse an
+    earlier file's name in another folder; half of those are exact copies.
+    """
+    rng = random.Random(seed)
+    mix = mix or DEFAULT_MIX
+    extensions, weights = list(mix), list(mix.values())
+    folders = [root]
+    frontier = [root]
+    for level in range(depth):
+        frontier = [
+            os.path.join(parent, f"dir{level}_{index}") for parent in frontier for index in range(fanout)
+        ]
+        folders.extend(frontier)
+    for folder in folders:
+        os.makedirs(folder, exist_ok=True)
+
+    names: list[tuple[str, bytes]] = []
+    for index in range(files):
+        folder = folders[index % len(folders)]
+        if names and rng.random() < collision_rate:
+            name, content = rng.choice(names)
+            if rng.random() < 0.5:
+                content = rng.randbytes(file_size)
+        else:
+            name = f"file{index:07d}{rng.choices(extensions, weights)[0]}"
+            content = rng.randbytes(file_size)
+            names.append((name, content))
+        path = os.path.join(folder, name)
+        if os.path.exists(path):
+            path = os.path.join(folder, f"x{index}_{name}")
+        with open(path, "wb") as f:
+            f.write(content)
+    return folders
+
+
+def _reset_peak_rss() -> bool:
+    """Reset the kernel's peak-RSS mark (Linux), so each phase reports its own peak."""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        return False
+    return True
+
+
+def _peak_rss_kb() -> int | None:
+    try:
+        with open("/proc/self/status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except (OSError, ValueError):
+        pass
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def _measure(counter: _CallCounter, files: int, action) -> dict:
+    _reset_peak_rss()
+    counter.calls = 0
+    counter.enabled = True
+    started = time.perf_counter()
+    try:
+        action()
+    finally:
+        seconds = time.perf_counter() - started
+        counter.enabled = False
+    return {
+        "seconds": round(seconds, 4),
+        "files": files,
+        "files_per_sec": round(files / seconds, 1) if seconds > 0 else None,
+        "fs_calls_per_file": round(counter.calls / files, 3) if files else None,
+        "peak_rss_kb": _peak_rss_kb(),
+    }
+
+
+def run_benchmark(args) -> dict:
+    base = tempfile.mkdtemp(prefix="fo-bench-", dir=args.dir)
+    corpus = os.path.join(base, "corpus")
+    journal = None if args.no_journal else UndoJournal(os.path.join(base, "journal"))
+    counter = _CallCounter()
+    try:
+        started = time.perf_counter()
+        folders = generate_corpus(
+            corpus,
+            args.files,
+            mix=parse_mix(args.mix) if args.mix else None,
+            depth=args.depth,
+            fanout=args.fanout,
+            collision_rate=args.collision_rate,
+            file_size=args.file_size,
+            seed=args.seed,
+        )
+        generate_seconds = time.perf_counter() - started
+        recursive = args.depth > 0
+        engine = OrganizerEngine(workers=args.workers, journal=journal, duplicates=args.duplicates)
+        phases = {}
+
+        def scan() -> None:
+            walker = TreeWalker(corpus, skip_set=set(), protected_paths=set(), recursive=recursive)
+            for _ in walker:
+                pass
+
+        def organize() -> None:
+            phases["organize_result"] = engine.run([("corpus", corpus, set())], recursive=recursive)
+
+        phases["scan"] = _measure(counter, args.files, scan)
+        phases["organize"] = _measure(counter, args.files, organize)
+        moved = phases.pop("organize_result").moved
+        phases["delete_empty"] = _measure(
+            counter, len(folders), lambda: engine.prune_empty_dirs(corpus, folders)
+        )
+        phases["undo"] = _measure(counter, moved, engine.undo)
+    finally:
+        if not args.keep:
+            shutil.rmtree(base, ignore_errors=True)
+
+    return {
+        "config": {
+            "files": args.files,
+            "depth": args.depth,
+            "fanout": args.fanout,
+            "folders": len(folders),
+            "collision_rate": args.collision_rate,
+            "file_size": args.file_size,
+            "workers": args.workers,
+            "duplicates": args.duplicates,
+            "journal": not args.no_journal,
+            "mix": args.mix or "default",
+            "seed": args.seed,
+        },
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "peak_rss": "per phase" if _reset_peak_rss() else "whole process",
+        },
+        "generate_seconds": round(generate_seconds, 4),
+        "moved": moved,
+        "phases": phases,
+    }
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="bench.py",
+        description="Time FileOrganizer's scan, organize, delete-empty and undo phases "
+        "on a synthetic folder tree and print the results as JSON.",
+    )
+    parser.add_argument("--files", type=int, default=10000, help="number of files (default: 10000)")
+    parser.add_argument("--depth", type=int, default=0, help="subfolder levels; >0 runs recursively")
+    parser.add_argument("--fanout", type=int, default=4, help="subfolders per level (default: 4)")
+    parser.add_argument(
+        "--collision-rate", type=float, default=0.0, help="share of files that reuse another file's name"
+    )
+    parser.add_argument("--file-size", type=int, default=64, metavar="BYTES", help="bytes per file")
+    parser.add_argument("--mix", metavar="SPEC", help='extension weights, e.g. ".pdf=3,.jpg=1,=1"')
+    parser.add_argument("--workers", type=int, default=1, help="parallel move workers")
+    parser.add_argument("--duplicates", choices=DUPLICATE_POLICIES, default="keep", help="duplicate policy")
+    parser.add_argument(
+        "--no-journal", action="store_true", help="keep undo records in memory instead of a journal file"
+    )
+    parser.add_argument("--seed", type=int, default=0, help="random seed for the corpus")
+    parser.add_argument(
+        "--dir",
+        metavar="DIR",
+        help="parent folder for the temporary corpus (default: the system temp dir)",
+    )
+    parser.add_argument("--keep", action="store_true", help="do not delete the corpus afterwards")
+    parser.add_argument("--output", metavar="FILE", help="append the JSON result to FILE as one line")
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    result = run_benchmark(args)
+    print(json.dumps(result, indent=2))
+    if args.output:
+        with open(args.output, "a", encoding="utf-8") as f:
+            f.write(json.dumps(result) + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
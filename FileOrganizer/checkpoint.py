@@ -0,0 +1,148 @@
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+
+CHECKPOINT_SUFFIX = ".jsonl"
+
+
+@dataclass
+class JobState:
+    job_id: str
+    path: str
+    started: str = ""
+    job: list[tuple[str, str, set[str]]] = field(default_factory=list)
+    options: dict = field(default_factory=dict)
+    finished_roots: set[str] = field(default_factory=set)
+    finished_dirs: dict[str, list[str]] = field(default_factory=dict)
+
+
+class CheckpointWriter:
+    """Append-only cursor of one job: which folders and roots are finished.
+
+    Records are buffered and written every ``batch_size`` folders or
+    ``flush_interval`` seconds, each write fsync'd, so an interruption only
+    costs the folders finished since the last flush.
+    """
+
+    def __init__(self, path: str, *, batch_size: int = 32, flush_interval: float = 2.0):
+        self.path = path
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+        self._buffer: list[str] = []
+        self._lock = threading.Lock()
+        self._file = open(path, "a", encoding="utf-8", newline="\n")
+        self._last_flush = time.monotonic()
+
+    def write_header(self, job_id: str, job, options: dict) -> None:
+        record = {
+            "job_id": job_id,
+            "started": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "job": [[label, path, sorted(skip or ())] for label, path, skip in job],
+            "options": options,
+        }
+        self._append(json.dumps(record), force=True)
+
+    def folder_done(self, root: str, folder: str, subdirs: list[str]) -> None:
+        self._append(json.dumps(["dir", root, folder, subdirs]))
+
+    def root_done(self, root: str) -> None:
+        self._append(json.dumps(["root", root]), force=True)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file.closed:
+                return
+            self._flush()
+            self._file.close()
+
+    def _append(self, line: str, *, force: bool = False) -> None:
+        with self._lock:
+            if self._file.closed:
+                return
+            self._buffer.append(line)
+            due = time.monotonic() - self._last_flush >= self._flush_interval
+            if force or due or len(self._buffer) >= self._batch_size:
+                self._flush()
+
+    def _flush(self) -> None:
+        if self._buffer:
+            self._file.write("\n".join(self._buffer) + "\n")
+            self._buffer.clear()
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        self._last_flush = time.monotonic()
+
+
+class CheckpointStore:
+    """Directory of checkpoints for jobs that have not finished; newest last."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def begin(self, job, options: dict) -> CheckpointWriter:
+        os.makedirs(self.directory, exist_ok=True)
+        now = time.time()
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(now))
+        job_id = f"{stamp}.{int(now * 1000) % 1000:03d}-{os.getpid()}"
+        writer = CheckpointWriter(self._path(job_id))
+        writer.write_header(job_id, job, options)
+        return writer
+
+    def reopen(self, state: JobState) -> CheckpointWriter:
+        return CheckpointWriter(state.path)
+
+    def pending(self) -> list[JobState]:
+        try:
+            names = sorted(os.listdir(self.directory))
+        except OSError:
+            return []
+        states = []
+        for name in names:
+            if name.endswith(CHECKPOINT_SUFFIX):
+                state = self._load(os.path.join(self.directory, name))
+                if state is not None:
+                    states.append(state)
+        return states
+
+    def find(self, job_id: str | None = None) -> JobState | None:
+        if job_id is None:
+            states = self.pending()
+            return states[-1] if states else None
+        path = self._path(job_id)
+        return self._load(path) if os.path.exists(path) else None
+
+    def discard(self, state_or_writer) -> None:
+        try:
+            os.remove(state_or_writer.path)
+        except OSError:
+            pass
+
+    def _path(self, job_id: str) -> str:
+        return os.path.join(self.directory, job_id + CHECKPOINT_SUFFIX)
+
+    def _load(self, path: str) -> JobState | None:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                lines = f.read().splitlines()
+            header = json.loads(lines[0])
+            state = JobState(
+                header["job_id"],
+                path,
+                header.get("started", ""),
+                [(label, folder, set(skip)) for label, folder, skip in header["job"]],
+                dict(header.get("options", {})),
+            )
+        except (OSError, ValueError, KeyError, TypeError, IndexError):
+            return None
+        for line in lines[1:]:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue  # torn final line after a crash
+            if record[:1] == ["dir"] and len(record) == 4:
+                state.finished_dirs[record[2]] = list(record[3])
+            elif record[:1] == ["root"] and len(record) == 2:
+                state.finished_roots.add(record[1])
+        return state
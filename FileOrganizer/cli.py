@@ -0,0 +1,431 @@
+import argparse
+import os
+import sys
+import threading
+import time
+
+from checkpoint import CheckpointStore
+from dedupe import DUPLICATE_POLICIES, HashCache
+from engine import (
+    APP_DIR,
+    DATA_DIR,
+    OrganizerEngine,
+    bulk_job,
+    format_duration,
+    format_log,
+    format_size,
+)
+from journal import UndoJournal
+from settings import SettingsStore, export_rule_set, read_rule_set
+from snapshot import SnapshotIndex
+from stats import STATS_ERRORS, StatsIndex, since_days
+
+DEFAULT_SETTINGS_FILE = os.path.join(APP_DIR, "settings.json")
+PROGRESS_INTERVAL = 2.0
+STATS_FILE = os.path.join(DATA_DIR, "stats.sqlite3")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m FileOrganizer",
+        description="Organize folders into category subfolders without starting the GUI.",
+    )
+    parser.add_argument("folders", nargs="*", help="folders to organize")
+    parser.add_argument(
+        "--all-user-folders",
+        action="store_true",
+        help="organize the 'roots' listed in settings.json, or Desktop, Downloads, "
+        "Documents, Pictures, Music and Videos if there are none",
+    )
+    parser.add_argument("--dry-run", action="store_true", help="preview only, move nothing")
+    parser.add_argument(
+        "--delete-empty", action="store_true", help="remove empty subfolders afterwards"
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="skip folders and files that have not changed since the last run",
+    )
+    parser.add_argument(
+        "--recursive",
+        action="store_true",
+        help="also organize files in subfolders (category folders are never entered)",
+    )
+    parser.add_argument(
+        "--max-depth",
+        type=int,
+        metavar="N",
+        help="with --recursive, descend at most N folder levels",
+    )
+    parser.add_argument(
+        "--exclude",
+        action="append",
+        default=[],
+        metavar="GLOB",
+        help="with --recursive, skip subfolders whose name or relative path matches (repeatable)",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="keep running and organize new files as they arrive (Ctrl+C to stop)",
+    )
+    parser.add_argument(
+        "--debounce",
+        type=float,
+        default=2.0,
+        metavar="SECONDS",
+        help="how long a new file must stay unchanged before it is moved in watch mode",
+    )
+    parser.add_argument(
+        "--rules",
+        metavar="FILE",
+        help="JSON rule file: a settings.json, an {'.ext': 'Folder'} mapping or a list of "
+        "rule objects; defaults to settings.json",
+    )
+    parser.add_argument(
+        "--sniff",
+        action="store_true",
+        help="look at the first bytes of files with no or an unknown extension to pick a category",
+    )
+    parser.add_argument(
+        "--root-workers",
+        type=int,
+        default=4,
+        metavar="N",
+        help="organize up to N root folders at the same time (default: 4)",
+    )
+    parser.add_argument(
+        "--per-device",
+        type=int,
+        default=1,
+        metavar="N",
+        help="but at most N roots on the same disk at a time (default: 1)",
+    )
+    parser.add_argument(
+        "--duplicates",
+        choices=DUPLICATE_POLICIES,
+        default="keep",
+        help="what to do with a file whose exact copy is already in its category folder: "
+        "leave it (default), delete it, or replace it with a hard link",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        metavar="N",
+        help="number of parallel move workers (default: 1)",
+    )
+    parser.add_argument(
+        "--metrics",
+        metavar="FILE",
+        help="write counters, phase timings and the slowest moves to FILE after the run "
+        "(Prometheus text format if FILE ends in .prom, JSON otherwise)",
+    )
+    parser.add_argument(
+        "--plan",
+        metavar="FILE",
+        help="do a dry run and save the moves it would make to FILE (JSON lines)",
+    )
+    parser.add_argument(
+        "--apply",
+        metavar="FILE",
+        help="carry out a plan saved with --plan instead of organizing",
+    )
+    parser.add_argument(
+        "--no-verify",
+        action="store_true",
+        help="with --apply, move files even if they changed since the plan was made",
+    )
+    parser.add_argument(
+        "--prune",
+        action="store_true",
+        help="only remove the empty folders below the given folders",
+    )
+    parser.add_argument(
+        "--undo",
+        nargs="?",
+        const="",
+        metavar="SESSION",
+        help="undo the latest session, or the given session id, instead of organizing",
+    )
+    parser.add_argument(
+        "--list-sessions", action="store_true", help="list sessions that can be undone"
+    )
+    parser.add_argument(
+        "--resume",
+        nargs="?",
+        const="",
+        metavar="JOB",
+        help="continue the latest interrupted job, or the given job id, instead of organizing",
+    )
+    parser.add_argument(
+        "--list-jobs", action="store_true", help="list interrupted jobs that can be resumed"
+    )
+    parser.add_argument(
+        "--journal-dir",
+        default=os.path.join(DATA_DIR, "journal"),
+        metavar="DIR",
+        help="where undo journals are kept (default: ~/.fileorganizer/journal)",
+    )
+    parser.add_argument(
+        "--export-rules",
+        metavar="FILE",
+        help="write the custom and advanced rules to FILE and exit",
+    )
+    parser.add_argument(
+        "--import-rules",
+        metavar="FILE",
+        help="merge the rules from FILE into the settings file and exit",
+    )
+    parser.add_argument(
+        "--report",
+        nargs="?",
+        const=7.0,
+        type=float,
+        metavar="DAYS",
+        help="print what past runs moved, created and failed on, over the last DAYS days (default: 7)",
+    )
+    parser.add_argument(
+        "--progress",
+        action="store_true",
+        help="print progress, throughput and ETA to stderr every few seconds",
+    )
+    parser.add_argument("-q", "--quiet", action="store_true", help="only print errors")
+    return parser
+
+
+def import_export_rules(args, rules_file: str, custom_rules: dict[str, str], rules: list[dict]) -> int:
+    try:
+        if args.export_rules:
+            export_rule_set(args.export_rules, custom_rules, rules)
+            message = f"Exported {len(custom_rules)} custom and {len(rules)} advanced rules."
+            print(format_log(message, "SUCCESS"))
+        if args.import_rules:
+            new_custom, new_rules = read_rule_set(args.import_rules)
+            store = SettingsStore(rules_file, save_delay=0)
+            merged_custom = {**store.get("custom_rules", {}), **new_custom}
+            merged_rules = list(store.get("rules", []))
+            merged_rules += [rule for rule in new_rules if rule not in merged_rules]
+            store.update(custom_rules=merged_custom, rules=merged_rules)
+            message = f"Imported {len(new_custom)} custom and {len(new_rules)} advanced rules."
+            print(format_log(message, "SUCCESS"))
+    except (OSError, ValueError) as err:
+        print(format_log(f"Rule import/export failed: {err}", "ERROR"), file=sys.stderr)
+        return 2
+    return 0
+
+
+def print_report(stats: StatsIndex, days: float) -> None:
+    since = since_days(days)
+    print(f"Runs since {since}:")
+    for run in stats.runs(since=since):
+        if not run["finished"]:
+            state = "interrupted"
+        else:
+            state = f"{run['seconds']:.1f}s" + (", cancelled" if run["status"] == "cancelled" else "")
+        print(
+            f"  #{run['id']}  {run['started']}  {run['kind']:<8}  {run['files_moved']} moved "
+            f"({format_size(run['bytes_moved'])}), {run['files_failed']} failed, {state}  "
+            f"{', '.join(run['roots'])}"
+        )
+    print("Moved by category:")
+    for row in stats.category_totals(since=since):
+        print(f"  {row['category']:<24} {row['files']:>8} files  {format_size(row['bytes']):>10}")
+    folders = stats.dynamic_folders(since=since)
+    if folders:
+        print("Folders created for unknown extensions:")
+        for row in folders:
+            label = row["extension"].upper() or "(no extension)"
+            print(f"  {label:<24} {row['folders']} folders in {row['runs']} runs, last {row['last_seen']}")
+    failures = stats.failures(since=since)
+    if failures:
+        print("Recent failures:")
+        for row in failures:
+            print(f"  #{row['run_id']}  {row['path']}: {row['error']}")
+
+
+def watch_folders(engine: OrganizerEngine, job, args, rules_file: str, on_log) -> None:
+    from watcher import FolderWatcher
+
+    watcher = FolderWatcher(engine, job, dry_run=args.dry_run, debounce=args.debounce, on_log=on_log)
+    thread = threading.Thread(target=watcher.run, daemon=True)
+    thread.start()
+    # Rule edits are picked up without a restart: one stat per tick.
+    store = SettingsStore(rules_file)
+    try:
+        while thread.is_alive():
+            thread.join(0.5)
+            if store.reload_if_changed():
+                try:
+                    custom_rules, rules = read_rule_set(rules_file)
+                    reloaded = engine.apply_settings({"custom_rules": custom_rules, "rules": rules})
+                except (OSError, ValueError, TypeError) as err:
+                    on_log(f"Keeping the previous rules, {rules_file} is invalid: {err}", "ERROR")
+                    continue
+                if reloaded:
+                    on_log(f"Reloaded rules from {rules_file}.", "INFO")
+    except KeyboardInterrupt:
+        watcher.stop()
+        thread.join()
+
+
+def run_job(kind: str, target, name: str, on_log):
+    """Run one job through the scheduler and wait for it; Ctrl+C cancels it
+    at the next file boundary instead of killing it mid-move."""
+    from scheduler import JobScheduler
+
+    scheduler = JobScheduler()
+    scheduler.subscribe(
+        lambda event: event.state != "queued" and on_log(f"{event.name}: {event.message}", event.level)
+    )
+    job = scheduler.submit(kind, target, name=name)
+    try:
+        scheduler.wait(job)
+    except KeyboardInterrupt:
+        print(format_log("Stopping after the current file...", "INFO"), file=sys.stderr)
+        scheduler.cancel(job.job_id)
+        scheduler.wait(job)
+    scheduler.shutdown()
+    return job
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    journal = UndoJournal(args.journal_dir)
+    checkpoints = CheckpointStore(os.path.join(DATA_DIR, "checkpoints"))
+    stats = StatsIndex(STATS_FILE)
+
+    if args.report is not None:
+        try:
+            print_report(stats, args.report)
+        except STATS_ERRORS as err:
+            print(format_log(f"Failed to read {STATS_FILE}: {err}", "ERROR"), file=sys.stderr)
+            return 2
+        return 0
+
+    if args.list_jobs:
+        for state in checkpoints.pending():
+            folders = ", ".join(path for _, path, _ in state.job)
+            print(f"{state.job_id}  {state.started}  {len(state.finished_dirs)} folders done  {folders}")
+        return 0
+
+    if args.list_sessions:
+        for session in journal.sessions():
+            state = f"{session.moved} moved" if session.complete else "interrupted"
+            print(f"{session.session_id}  {session.started}  {state}  {', '.join(session.folders)}")
+        return 0
+
+    job = [(folder, os.path.abspath(folder), set()) for folder in args.folders]
+    if args.all_user_folders:
+        roots = SettingsStore(args.rules or DEFAULT_SETTINGS_FILE).get("roots")
+        job.extend(bulk_job(roots if isinstance(roots, list) else None))
+    rules_only = args.import_rules or args.export_rules
+    if not job and args.undo is None and args.resume is None and not args.apply and not rules_only:
+        parser.error("give at least one folder or --all-user-folders")
+
+    rules_file = args.rules or DEFAULT_SETTINGS_FILE
+    custom_rules: dict[str, str] = {}
+    rules: list[dict] = []
+    if args.rules or os.path.exists(rules_file):
+        try:
+            custom_rules, rules = read_rule_set(rules_file)
+        except (OSError, ValueError) as err:
+            print(format_log(f"Failed to load rules: {err}", "ERROR"), file=sys.stderr)
+            return 2
+    if rules_only:
+        return import_export_rules(args, rules_file, custom_rules, rules)
+
+    errors = 0
+
+    def on_log(message: str, level: str) -> None:
+        nonlocal errors
+        if level == "ERROR":
+            errors += 1
+            print(format_log(message, level), file=sys.stderr)
+        elif not args.quiet:
+            print(format_log(message, level))
+
+    last_report = 0.0
+
+    def on_report(report) -> None:
+        nonlocal last_report
+        now = time.monotonic()
+        if now - last_report < PROGRESS_INTERVAL and report.fraction < 1.0:
+            return
+        last_report = now
+        eta = format_duration(report.eta_seconds) if report.eta_seconds is not None else "--"
+        print(
+            f"{report.fraction:6.1%}  {report.files_done}/{report.files_found} files  "
+            f"{format_size(report.bytes_done)}  {format_size(report.bytes_per_second)}/s  "
+            f"{report.files_per_second:.0f} files/s  ETA {eta}",
+            file=sys.stderr,
+        )
+
+    engine = OrganizerEngine(
+        custom_rules,
+        rules=rules,
+        on_log=on_log,
+        on_report=on_report if args.progress else None,
+        workers=args.workers,
+        root_workers=args.root_workers,
+        per_device=args.per_device,
+        journal=journal,
+        snapshots=SnapshotIndex(os.path.join(DATA_DIR, "index")),
+        checkpoints=checkpoints,
+        stats=stats,
+        duplicates=args.duplicates,
+        sniff_content=args.sniff,
+        metrics_path=args.metrics,
+        hash_cache=HashCache(os.path.join(DATA_DIR, "hashes.json")),
+    )
+    if args.undo is not None:
+        if not journal.find(args.undo or None):
+            print(format_log("No operations to undo.", "SKIP"))
+            return 1
+        task = run_job(
+            "undo", lambda control: engine.undo(args.undo or None, control=control), "Undo", on_log
+        )
+    elif args.apply:
+        task = run_job(
+            "apply",
+            lambda control: engine.apply_plan(args.apply, verify=not args.no_verify, control=control),
+            f"Apply {args.apply}",
+            on_log,
+        )
+    elif args.resume is not None:
+        task = run_job(
+            "resume", lambda control: engine.resume(args.resume or None, control=control), "Resume", on_log
+        )
+        if task.state == "done" and task.result is None:
+            return 1
+    elif args.prune:
+        task = run_job(
+            "prune",
+            lambda control: sum(engine.prune(path, control=control) for _, path, _ in job),
+            "Remove empty folders",
+            on_log,
+        )
+    elif args.watch:
+        watch_folders(engine, job, args, rules_file, on_log)
+        return 1 if errors else 0
+    else:
+        task = run_job(
+            "organize",
+            lambda control: engine.run(
+                job,
+                dry_run=args.dry_run or bool(args.plan),
+                plan_path=args.plan,
+                delete_empty=args.delete_empty,
+                incremental=args.incremental,
+                recursive=args.recursive,
+                max_depth=args.max_depth,
+                exclude=args.exclude,
+                control=control,
+            ),
+            "Organize",
+            on_log,
+        )
+    if task.state == "cancelled":
+        return 130
+    return 1 if errors else 0
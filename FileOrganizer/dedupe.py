@@ -0,0 +1,142 @@
+import hashlib
+import json
+import os
+import re
+import threading
+
+PARTIAL_BYTES = 4096
+HASH_CHUNK = 1024 * 1024
+DUPLICATE_POLICIES = ("keep", "delete", "hardlink")
+_COLLISION_SUFFIX = re.compile(r"(?: \(\d+\))+$")
+
+
+class HashCache:
+    """Per-file facts (content hashes, sniffed type) keyed by ``(st_dev, st_ino)``
+    and valid while size and mtime match.
+
+    Moves within a device keep the inode, so files hashed in one run are
+    still cached in their new place on the next one. With ``path=None`` the
+    cache only lives for the process.
+    """
+
+    def __init__(self, path: str | None = None, *, max_entries: int = 200_000):
+        self.path = path
+        self.max_entries = max_entries
+        self._entries: dict[str, list] | None = None
+        self._dirty = False
+        self._lock = threading.Lock()
+
+    def get(self, info: os.stat_result, kind: int) -> str | None:
+        with self._lock:
+            entry = self._load().get(_key(info))
+        if entry is None or entry[0] != info.st_size or entry[1] != info.st_mtime_ns:
+            return None
+        return entry[kind] if kind < len(entry) else None
+
+    def put(self, info: os.stat_result, kind: int, value: str) -> None:
+        key = _key(info)
+        with self._lock:
+            entries = self._load()
+            entry = entries.pop(key, None)
+            if entry is None or entry[0] != info.st_size or entry[1] != info.st_mtime_ns:
+                entry = [info.st_size, info.st_mtime_ns]
+            entry.extend([None] * (kind + 1 - len(entry)))
+            entry[kind] = value
+            entries[key] = entry
+            self._dirty = True
+
+    def save(self) -> None:
+        with self._lock:
+            if self.path is None or not self._dirty:
+                return
+            entries = self._load()
+            for key in list(entries)[: max(0, len(entries) - self.max_entries)]:
+                del entries[key]
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            temp_path = self.path + ".tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(entries, f, separators=(",", ":"))
+            os.replace(temp_path, self.path)
+            self._dirty = False
+
+    def _load(self) -> dict[str, list]:
+        if self._entries is None:
+            self._entries = {}
+            if self.path is not None:
+                try:
+                    with open(self.path, "r", encoding="utf-8") as f:
+                        data = json.load(f)
+                    if isinstance(data, dict):
+                        self._entries = data
+                except (OSError, ValueError):
+                    pass
+        return self._entries
+
+
+class ContentComparer:
+    """Decides whether two files hold the same bytes, reading as little as possible.
+
+    Sizes are compared first, then a BLAKE2b hash of the first and last
+    ``PARTIAL_BYTES``, and only files still tied get a full streaming hash.
+    """
+
+    PARTIAL, FULL = 2, 3
+
+    def __init__(self, cache: HashCache | None = None):
+        self.cache = cache if cache is not None else HashCache()
+
+    def same_content(self, path_a: str, path_b: str) -> bool:
+        info_a, info_b = os.stat(path_a), os.stat(path_b)
+        if info_a.st_size != info_b.st_size:
+            return False
+        if (info_a.st_dev, info_a.st_ino) == (info_b.st_dev, info_b.st_ino):
+            return True
+        if self._digest(path_a, info_a, self.PARTIAL) != self._digest(path_b, info_b, self.PARTIAL):
+            return False
+        if info_a.st_size <= 2 * PARTIAL_BYTES:
+            return True  # the partial hash already covered every byte
+        return self._digest(path_a, info_a, self.FULL) == self._digest(path_b, info_b, self.FULL)
+
+    def _digest(self, path: str, info: os.stat_result, kind: int) -> str:
+        digest = self.cache.get(info, kind)
+        if digest is None:
+            digest = _partial_hash(path, info.st_size) if kind == self.PARTIAL else _full_hash(path)
+            self.cache.put(info, kind, digest)
+        return digest
+
+
+def collision_names(filename: str, limit: int = 1000):
+    """``name.ext``, then ``name (1).ext``, ``name (2).ext`` ... in a fixed order."""
+    yield filename
+    stem, extension = os.path.splitext(filename)
+    for number in range(1, limit):
+        yield f"{stem} ({number}){extension}"
+
+
+def collision_stem(filename: str) -> str:
+    """What every name that could claim ``filename`` has in common:
+    ``r.txt``, ``r (1).txt`` and ``r (1) (1).txt`` all give ``r.txt``."""
+    stem, extension = os.path.splitext(filename)
+    return _COLLISION_SUFFIX.sub("", stem) + extension
+
+
+def _partial_hash(path: str, size: int) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        digest.update(f.read(PARTIAL_BYTES))
+        if size > 2 * PARTIAL_BYTES:
+            f.seek(-PARTIAL_BYTES, os.SEEK_END)
+        digest.update(f.read(PARTIAL_BYTES))
+    return digest.hexdigest()
+
+
+def _full_hash(path: str) -> str:
+    digest = hashlib.blake2b(digest_size=32)
+    with open(path, "rb") as f:
+        while chunk := f.read(HASH_CHUNK):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _key(info: os.stat_result) -> str:
+    return f"{info.st_dev}:{info.st_ino}"
@@ -0,0 +1,1359 @@
+import itertools
+import math
+import os
+import stat
+import threading
+import time
+import zlib
+from array import array
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import NamedTuple
+
+from dedupe import DUPLICATE_POLICIES, ContentComparer, HashCache, collision_names, collision_stem
+from jobs import JobCancelled
+from journal import MoveLog
+from metrics import JobMetrics
+from mover import FileMover
+from plan import MovePlan, PlanItem, read_plan
+from rules import RuleError, RuleSet
+from scanner import DirListing, ScanEntry, TreeWalker, _protected_names, prefetch
+from sniffer import ContentSniffer
+from stats import STATS_ERRORS
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(os.path.expanduser("~"), ".fileorganizer")
+
+MASTER_CATEGORIES = {
+    "System_Apps": [".exe", ".msi", ".bat", ".apk", ".jar", ".dmg", ".bin", ".iso"],
+    "Documents": [".txt", ".doc", ".docx", ".pdf", ".xls", ".xlsx", ".ppt", ".pptx", ".rtf", ".csv"],
+    "Images": [".jpg", ".jpeg", ".png", ".gif", ".svg", ".bmp", ".psd", ".webp", ".ico"],
+    "Audio": [".mp3", ".wav", ".flac", ".mid", ".midi", ".ogg"],
+    "Videos": [".mp4", ".avi", ".mkv", ".mov", ".wmv", ".flv"],
+    "Archives": [".zip", ".rar", ".7z", ".tar", ".gz"],
+    "Developer_Files": [".html", ".css", ".js", ".py", ".php", ".json", ".xml", ".sql"],
+}
+MASTER_EXTENSION_MAP = {
+    ext.lower(): category
+    for category, extensions in MASTER_CATEGORIES.items()
+    for ext in extensions
+}
+STANDARD_USER_FOLDERS = [
+    ("Desktop", {".lnk", ".url"}),
+    ("Downloads", set()),
+    ("Documents", set()),
+    ("Pictures", set()),
+    ("Music", set()),
+    ("Videos", set()),
+]
+LOG_PREFIXES = {
+    "INFO": "[INFO] ",
+    "SUCCESS": "[SUCCESS] ",
+    "ERROR": "[ERROR] ",
+    "SKIP": "[SKIP] ",
+}
+
+
+def format_log(message: str, level: str = "INFO") -> str:
+    return f"{LOG_PREFIXES.get(level.upper(), '[INFO] ')}{message}"
+
+
+def standard_job(base: str | None = None) -> list[tuple[str, str, set[str]]]:
+    base = base or os.path.expanduser("~")
+    return [(name, os.path.join(base, name), set(skip)) for name, skip in STANDARD_USER_FOLDERS]
+
+
+def format_size(size: float) -> str:
+    if size < 1024:
+        return f"{size:.0f} B"
+    for unit in ("KB", "MB"):
+        size /= 1024
+        if size < 1024:
+            return f"{size:.1f} {unit}"
+    return f"{size / 1024:.1f} GB"
+
+
+def format_duration(seconds: float) -> str:
+    seconds = int(round(seconds))
+    if seconds < 60:
+        return f"{seconds}s"
+    if seconds < 3600:
+        return f"{seconds // 60}m {seconds % 60:02d}s"
+    return f"{seconds // 3600}h {seconds % 3600 // 60:02d}m"
+
+
+def bulk_job(roots=None) -> list[tuple[str, str, set[str]]]:
+    """The "organize all" job: the configured roots, or the standard user folders.
+
+    Each root is a path or ``{"path": ..., "label": ..., "skip_extensions": [...]}``.
+    """
+    if not roots:
+        return standard_job()
+    job = []
+    for root in roots:
+        spec = root if isinstance(root, dict) else {"path": root}
+        if not spec.get("path"):
+            continue
+        path = os.path.abspath(os.path.expanduser(str(spec["path"])))
+        label = spec.get("label") or os.path.basename(path) or path
+        job.append((label, path, {str(ext).lower() for ext in spec.get("skip_extensions", [])}))
+    return job
+
+
+def _noop(*_args, **_kwargs) -> None:
+    return None
+
+
+def _setting_count(settings: dict, key: str, default: int) -> int:
+    """A worker count from settings, at least 1; ``ValueError`` if it is not a whole number."""
+    value = settings.get(key, default)
+    if isinstance(value, bool) or not isinstance(value, (int, str)):
+        raise ValueError(f"{key} must be a whole number, not {value!r}")
+    try:
+        return max(1, int(value))
+    except ValueError:
+        raise ValueError(f"{key} must be a whole number, not {value!r}") from None
+
+
+@dataclass
+class ProgressReport:
+    """A throttled snapshot of a running job, for status lines and dashboards.
+
+    Rates are smoothed over the last few seconds; ``eta_seconds`` covers the
+    files found so far (folders not yet scanned are unknown) and is None
+    until there is a rate to go by.
+    """
+
+    fraction: float
+    files_done: int
+    files_found: int
+    bytes_done: int
+    bytes_found: int
+    files_per_second: float
+    bytes_per_second: float
+    eta_seconds: float | None
+    categories: dict[str, list[int]]  # category -> [files, bytes] done
+
+
+class _StreamProgress:
+    """Progress for a streamed job: each root is an equal share, and inside a
+    root the share done is ``weight processed / weight discovered so far``.
+
+    A file weighs its size plus ``FILE_WEIGHT``, so a large video counts for
+    more than a small text file but thousands of empty files still move the
+    bar. Roots may run concurrently; the reported value never moves back,
+    and reports go out at most every ``interval`` seconds.
+    """
+
+    FILE_WEIGHT = 256 * 1024
+    SMOOTHING_SECONDS = 5.0
+
+    def __init__(self, total_roots: int, report, on_report=None, *, interval: float = 0.25):
+        self._total_roots = max(1, total_roots)
+        self._found = [0] * self._total_roots
+        self._done = [0] * self._total_roots
+        self._finished = [False] * self._total_roots
+        self._files = [0, 0]  # found, done
+        self._bytes = [0, 0]
+        self._categories: dict[str, list[int]] = {}
+        self._last = 0.0
+        self._report = report
+        self._on_report = on_report or _noop
+        self._interval = interval
+        self._last_emit = self._rate_time = time.monotonic()
+        self._rate_base = (0, 0, 0)  # files, bytes, weight at _rate_time
+        self._rates: list[float] | None = None  # files/s, bytes/s, weight/s
+        self._lock = threading.Lock()
+
+    def discover(self, root: int, count: int, size: int = 0) -> None:
+        with self._lock:
+            self._found[root] += size + count * self.FILE_WEIGHT
+            self._files[0] += count
+            self._bytes[0] += size
+
+    def advance(self, root: int, count: int = 1, size: int = 0, category: str | None = None) -> None:
+        with self._lock:
+            self._done[root] += size + count * self.FILE_WEIGHT
+            self._files[1] += count
+            self._bytes[1] += size
+            if category is not None:
+                totals = self._categories.setdefault(category, [0, 0])
+                totals[0] += count
+                totals[1] += size
+            report = self._snapshot(force=False)
+        self._publish(report)
+
+    def root_done(self, root: int) -> None:
+        with self._lock:
+            self._finished[root] = True
+            report = self._snapshot(force=True)
+        self._publish(report)
+
+    def _publish(self, report: ProgressReport | None) -> None:
+        if report is not None:
+            self._report(report.fraction)
+            self._on_report(report)
+
+    def _snapshot(self, *, force: bool) -> ProgressReport | None:
+        now = time.monotonic()
+        if not force and now - self._last_emit < self._interval:
+            return None
+        self._last_emit = now
+        total = sum(
+            1.0 if finished else (done / found if found else 0.0)
+            for finished, done, found in zip(self._finished, self._done, self._found)
+        )
+        self._last = max(self._last, total / self._total_roots)
+
+        weight_done = sum(self._done)
+        elapsed = now - self._rate_time
+        if elapsed >= self._interval:
+            current = (self._files[1], self._bytes[1], weight_done)
+            measured = [(value - base) / elapsed for value, base in zip(current, self._rate_base)]
+            if self._rates is None:
+                self._rates = measured
+            else:
+                alpha = 1.0 - math.exp(-elapsed / self.SMOOTHING_SECONDS)
+                self._rates = [rate + alpha * (new - rate) for rate, new in zip(self._rates, measured)]
+            self._rate_base, self._rate_time = current, now
+        remaining = sum(
+            max(0, found - done)
+            for finished, done, found in zip(self._finished, self._done, self._found)
+            if not finished
+        )
+        files_rate, bytes_rate, weight_rate = self._rates or (0.0, 0.0, 0.0)
+        return ProgressReport(
+            fraction=self._last,
+            files_done=self._files[1],
+            files_found=self._files[0],
+            bytes_done=self._bytes[1],
+            bytes_found=self._bytes[0],
+            files_per_second=files_rate,
+            bytes_per_second=bytes_rate,
+            eta_seconds=remaining / weight_rate if weight_rate > 0 else None,
+            categories={name: list(totals) for name, totals in self._categories.items()},
+        )
+
+
+class _MoveSession:
+    """State shared by every root of one run; safe to use from root threads."""
+
+    def __init__(self, engine: "OrganizerEngine", roots: list[str], *, dry_run: bool, track_snapshots: bool):
+        self.engine = engine
+        self.roots = roots
+        self.dry_run = dry_run
+        self.track_snapshots = track_snapshots
+        self.writer = None
+        self.checkpoint = None
+        self.failed_roots = 0
+        self.undo_moves = MoveLog()
+        self.undo_order = array("Q")
+        self.queued = 0
+        self.moving = False
+        self._next_index = 0
+        self._journal_tried = False
+        self._lock = threading.Lock()
+
+    def allocate(self, count: int) -> int:
+        """Reserve ``count`` consecutive task indices and count them as queued."""
+        with self._lock:
+            first = self._next_index
+            self._next_index += count
+            self.queued += count
+        return first
+
+    def start_moving(self) -> None:
+        with self._lock:
+            if not self.moving:
+                self.moving = True
+                self.engine._set_phase("moving")
+                self.engine._set_status_text("Moving files...")
+            if self.dry_run or self._journal_tried or self.engine.journal is None:
+                return
+            self._journal_tried = True
+            try:
+                self.writer = self.engine.journal.begin(self.roots)
+            except OSError as err:
+                self.engine._log(f"Undo journal unavailable, keeping undo in memory: {err}", level="ERROR")
+
+    def record(self, index: int, move: tuple[str, ...]) -> None:
+        if self.writer is not None:
+            self.writer.record(*move)
+        else:
+            with self._lock:
+                self.undo_order.append(index)
+                self.undo_moves.append(move)
+
+    def finish_root(self, root: "_RootRun") -> None:
+        with self._lock:
+            if root.failed:
+                self.failed_roots += 1
+            elif self.checkpoint is not None:
+                self.checkpoint.root_done(root.path)
+
+    @property
+    def moved(self) -> int:
+        return self.writer.moved if self.writer is not None else len(self.undo_moves)
+
+    def undo_log(self) -> MoveLog:
+        """The in-memory moves in task order (workers may finish out of order)."""
+        order = self.undo_order
+        if all(order[i] < order[i + 1] for i in range(len(order) - 1)):
+            return self.undo_moves
+        return self.undo_moves.reordered(sorted(range(len(order)), key=order.__getitem__))
+
+
+class _RootRun:
+    """State of one root's pipeline."""
+
+    def __init__(self, session: _MoveSession, number: int, label: str, path: str, progress: _StreamProgress):
+        self.session = session
+        self.number = number
+        self.label = label
+        self.path = path
+        self._progress = progress
+        self.queued = 0
+        self.failed = False
+        self.created_dirs: set[str] = set()
+        self.destination_dirs: dict[str, str] = {}
+        self.vacated_dirs: set[str] = set()
+        self.moved_indices: set[int] = set()
+
+    def discover(self, count: int, size: int = 0) -> None:
+        self._progress.discover(self.number, count, size)
+
+    def advance(self, count: int = 1, size: int = 0, category: str | None = None) -> None:
+        self._progress.advance(self.number, count, size, category)
+
+    def destination_dir(self, category: str) -> str:
+        # One shared string per category instead of a fresh join per file.
+        path = self.destination_dirs.get(category)
+        if path is None:
+            path = self.destination_dirs[category] = os.path.join(self.path, category)
+        return path
+
+    def on_moved(self, index: int, move: tuple[str, ...]) -> None:
+        self.vacated_dirs.add(os.path.dirname(move[1]))
+        if self.session.track_snapshots:
+            self.moved_indices.add(index)
+        self.session.record(index, move)
+
+
+class MoveTask(NamedTuple):
+    index: int
+    entry: ScanEntry
+    destination_dir: str
+    category: str
+
+
+@dataclass
+class RunResult:
+    queued: int = 0
+    moved: int = 0
+    dry_run: bool = False
+    plan: MovePlan | None = None
+
+
+class OrganizerEngine:
+    """GUI-free sorting engine shared by the desktop app and the command line.
+
+    All feedback goes through plain callbacks, so the engine can run from cron
+    or a server without a Tk root. ``on_log`` receives ``(message, level)``.
+    """
+
+    def __init__(
+        self,
+        custom_rules: dict[str, str] | None = None,
+        *,
+        rules=None,
+        on_log=None,
+        on_progress=None,
+        on_report=None,
+        on_status=None,
+        on_phase=None,
+        workers: int = 1,
+        journal=None,
+        snapshots=None,
+        checkpoints=None,
+        stats=None,
+        duplicates: str = "keep",
+        hash_cache: HashCache | None = None,
+        sniff_content: bool = False,
+        on_metrics=None,
+        metrics_path: str | None = None,
+        root_workers: int = 4,
+        per_device: int = 1,
+    ):
+        self.custom_rules = {
+            ext.lower(): folder for ext, folder in (custom_rules or {}).items()
+        }
+        self.rules: list[dict] = list(rules or [])
+        self.workers = max(1, int(workers))
+        self.root_workers = max(1, int(root_workers))
+        self.per_device = max(1, int(per_device))
+        self.journal = journal
+        self.mover = FileMover()
+        self.duplicates = duplicates if duplicates in DUPLICATE_POLICIES else "keep"
+        self.comparer = ContentComparer(hash_cache)
+        self.sniffer = ContentSniffer(self.comparer.cache) if sniff_content else None
+        self.snapshots = snapshots
+        self.checkpoints = checkpoints
+        self.stats = stats
+        self._run_stats = None
+        self._control = None
+        self.undo_log = MoveLog()
+        self.plan: MovePlan | None = None
+        self._ruleset: RuleSet | None = None
+        self._extension_table: dict[str, str] | None = None
+        self._on_log = on_log or _noop
+        self._on_progress = on_progress or _noop
+        self._on_report = on_report or _noop
+        self._on_status = on_status or _noop
+        self._on_phase = on_phase or _noop
+        self._on_metrics = on_metrics or _noop
+        self.metrics_path = metrics_path
+        self.metrics = JobMetrics()
+
+    # region Operations
+    MOVE_BATCH_SIZE = 1024
+
+    def run(
+        self,
+        job_definitions,
+        *,
+        dry_run: bool = False,
+        delete_empty: bool = False,
+        incremental: bool = False,
+        recursive: bool = False,
+        max_depth: int | None = None,
+        exclude=(),
+        resume=None,
+        plan_path: str | None = None,
+        control=None,
+    ) -> RunResult:
+        """Organize every ``(label, path, skip_extensions)`` in ``job_definitions``.
+
+        A dry run only builds a ``MovePlan``: it is summarized by category at
+        the end and, with ``plan_path``, saved for :meth:`apply_plan`.
+
+        With a checkpoint store, a real run records which folders it finished
+        so an interrupted run can be continued with :meth:`resume`; ``resume``
+        is the ``JobState`` of the run being continued.
+
+        ``control`` is the ``JobControl`` of the scheduler job running this;
+        it is checked between files, and a cancelled run stops there and
+        keeps its checkpoint.
+        """
+        self._control = control
+        self._update_progress(0)
+        self.metrics = JobMetrics()
+        result = RunResult(dry_run=dry_run)
+        if not self.compile_rules():
+            self._set_phase("done")
+            self._set_status_text("Idle")
+            self._publish_metrics()
+            return result
+
+        jobs = list(job_definitions)
+        session = _MoveSession(
+            self,
+            [folder_path for _, folder_path, _ in jobs],
+            dry_run=dry_run,
+            # Only incremental runs read the index, so only they pay to write it.
+            track_snapshots=self.snapshots is not None and incremental and not dry_run,
+        )
+        progress = _StreamProgress(len(jobs), self._update_progress, self._report_progress)
+        self.plan = None
+        if dry_run:
+            try:
+                self.plan = MovePlan(plan_path, roots=session.roots)
+            except OSError as err:
+                self._log(f"Failed to write plan to {plan_path}: {err}", level="ERROR")
+                self.plan = MovePlan()
+        result.plan = self.plan
+        self._run_stats = None
+        if not dry_run:
+            self._begin_stats("resume" if resume is not None else "organize", session.roots)
+        protected_paths = self._protected_paths()
+        output_names = self._output_folder_names()
+        if self.checkpoints is not None and not dry_run:
+            options = {
+                "delete_empty": delete_empty,
+                "incremental": incremental,
+                "recursive": recursive,
+                "max_depth": max_depth,
+                "exclude": list(exclude),
+            }
+            try:
+                if resume is not None:
+                    session.checkpoint = self.checkpoints.reopen(resume)
+                else:
+                    session.checkpoint = self.checkpoints.begin(jobs, options)
+            except OSError as err:
+                self._log(f"Checkpoint unavailable, this run cannot be resumed: {err}", level="ERROR")
+
+        def organize(number: int, label: str, folder_path: str, skip_exts) -> None:
+            if resume is not None and folder_path in resume.finished_roots:
+                self._log(f"{folder_path} was already finished before the interruption.", level="SKIP")
+                progress.root_done(number)
+                return
+            walker = TreeWalker(
+                folder_path,
+                skip_set={ext.lower() for ext in (skip_exts or set())},
+                protected_paths=protected_paths,
+                recursive=recursive,
+                max_depth=max_depth,
+                exclude=exclude,
+                output_names=output_names,
+                snapshots=self.snapshots,
+                incremental=incremental,
+                completed=resume.finished_dirs if resume is not None else None,
+                on_log=lambda message, level: self._log(message, level=level),
+            )
+            root = _RootRun(session, number, label, folder_path, progress)
+            try:
+                self._organize_root(root, walker, executor, delete_empty=delete_empty)
+            except JobCancelled:
+                raise
+            except Exception as err:  # one broken root must not stop the others
+                root.failed = True
+                self._log(f"Organizing {folder_path} failed: {err}", level="ERROR")
+            finally:
+                progress.root_done(number)
+            session.finish_root(root)
+
+        self._set_phase("scanning")
+        executor = ThreadPoolExecutor(self.workers) if self.workers > 1 else None
+        completed = cancelled = False
+        try:
+            self._run_roots(jobs, organize)
+            self._checkpoint()  # a cancelled parallel run returns early, not completed
+            completed = True
+        except JobCancelled:
+            cancelled = True
+            raise
+        finally:
+            if executor is not None:
+                executor.shutdown()
+            if session.writer is not None:
+                session.writer.close()
+            if session.checkpoint is not None:
+                session.checkpoint.close()
+                if completed and session.failed_roots == 0:
+                    self.checkpoints.discard(session.checkpoint)
+            if self.plan is not None:
+                self._close_plan(self.plan, completed)
+                self.plan = None
+            if not dry_run:
+                self.undo_log = session.undo_log()
+            self._save_hash_cache()
+            if cancelled:
+                # What was moved before the stop is still recorded and reported.
+                self._publish_metrics("cancelled")
+
+        result.queued = session.queued
+        if session.queued == 0:
+            self._log("No files queued for processing.", level="SKIP")
+            self._set_phase("done")
+            self._set_status_text("Idle")
+            self._publish_metrics()
+            return result
+
+        if dry_run:
+            self._log_plan_summary(result.plan)
+            self._log("Dry run complete. No files were moved.", level="INFO")
+        else:
+            result.moved = session.moved
+            self._log_copy_stats()
+            self._log(f"Session complete. {result.moved} files moved.", level="SUCCESS")
+
+        self._set_phase("done")
+        self._set_status_text("Done")
+        self._publish_metrics()
+        return result
+
+    def _publish_metrics(self, status: str = "done") -> None:
+        self.metrics.finish()
+        if self._run_stats is not None:
+            try:
+                self._run_stats.finish(self.metrics, status)
+            except STATS_ERRORS as err:
+                self._log(f"Failed to record run statistics: {err}", level="ERROR")
+            self._run_stats = None
+        if self.metrics_path:
+            try:
+                self.metrics.write(self.metrics_path)
+            except OSError as err:
+                self._log(f"Failed to write metrics to {self.metrics_path}: {err}", level="ERROR")
+        self._on_metrics(self.metrics)
+
+    def _run_roots(self, jobs: list, organize) -> None:
+        """Run ``organize`` for every root, at most ``root_workers`` at a time and
+        at most ``per_device`` at a time on any one device."""
+        numbered = [(number, *job) for number, job in enumerate(jobs)]
+        if len(numbered) < 2 or self.root_workers < 2:
+            for job in numbered:
+                organize(*job)
+            return
+
+        by_device: dict[object, deque] = {}
+        for job in numbered:
+            try:
+                device = os.stat(job[2]).st_dev
+            except OSError:
+                device = job[2]  # missing root: its own group, it is skipped quickly
+            by_device.setdefault(device, deque()).append(job)
+
+        slots = threading.BoundedSemaphore(self.root_workers)
+
+        def drain(queue: deque) -> None:
+            while True:
+                try:
+                    job = queue.popleft()
+                except IndexError:
+                    return
+                with slots:
+                    try:
+                        organize(*job)
+                    except JobCancelled:
+                        return
+
+        threads = [
+            threading.Thread(target=drain, args=(queue,), daemon=True)
+            for queue in by_device.values()
+            for _ in range(min(self.per_device, len(queue)))
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    def _organize_root(self, root: _RootRun, walker: TreeWalker, executor, *, delete_empty: bool) -> None:
+        session = root.session
+        folder_path = root.path
+        if not os.path.isdir(folder_path):
+            self._log(f"{root.label} not found at {folder_path}.", level="SKIP")
+            return
+        self._log(f"--- Starting Organization of {folder_path} ---", level="INFO")
+
+        metrics = self.metrics
+        started = time.perf_counter()
+        seen_subdirs: set[str] = set()
+        try:
+            # The walker reads ahead on its own thread, so the next folder is
+            # scanned while this one's files are moved.
+            listings = prefetch(walker)
+            while True:
+                self._checkpoint()
+                with metrics.timer("scan"):
+                    listing = next(listings, None)
+                if listing is None:
+                    break
+                metrics.count("dirs_scanned")
+                if delete_empty:
+                    seen_subdirs.update(os.path.join(listing.path, name) for name in listing.subdirs)
+                scanned = len(listing.entries) + len(listing.unchanged) + len(listing.ignored)
+                metrics.count("files_scanned", scanned)
+                metrics.count("files_unchanged", len(listing.unchanged))
+                metrics.count("files_skipped", len(listing.ignored))
+                first_index = session.allocate(len(listing.entries))
+                if listing.entries:
+                    root.queued += len(listing.entries)
+                    root.discover(len(listing.entries), sum(listing.entries.sizes))
+                    self._move_listing(root, listing, first_index, executor)
+                if session.track_snapshots:
+                    with metrics.timer("snapshot"):
+                        self._save_listing_snapshot(root, listing, first_index)
+                if session.checkpoint is not None:
+                    session.checkpoint.folder_done(folder_path, listing.path, listing.subdirs)
+        except OSError as err:
+            root.failed = True
+            self._log(f"Failed to read {folder_path}: {err}", level="ERROR")
+            return
+        finally:
+            metrics.record_root(folder_path, time.perf_counter() - started, root.queued)
+
+        if root.queued == 0:
+            if not walker.root_unchanged:
+                self._log(f"No eligible files found in {folder_path}.", level="SKIP")
+            return
+
+        if delete_empty and not session.dry_run:
+            with metrics.timer("delete_empty"):
+                self.prune_empty_dirs(folder_path, root.vacated_dirs | seen_subdirs)
+
+        self._log(f"--- Finished {folder_path} ---", level="INFO")
+
+    def _move_listing(self, root: _RootRun, listing: DirListing, first_index: int, executor) -> None:
+        session = root.session
+        session.start_moving()
+        for start in range(0, len(listing.entries), self.MOVE_BATCH_SIZE):
+            tasks: list[MoveTask] = []
+            destinations: dict[str, tuple[str, str, bool]] = {}
+            classify_started = time.perf_counter()
+            for offset, entry in enumerate(listing.entries[start:start + self.MOVE_BATCH_SIZE], start):
+                extension = os.path.splitext(entry.name)[1].lower()
+                category, dynamic_folder = self.category_for(
+                    entry.name, entry.size, entry.mtime_ns, entry.path
+                )
+                destination_dir = root.destination_dir(category)
+                if destination_dir not in root.created_dirs:
+                    destinations.setdefault(destination_dir, (category, extension, dynamic_folder))
+                tasks.append(MoveTask(first_index + offset, entry, destination_dir, category))
+            self.metrics.add_time("classify", time.perf_counter() - classify_started)
+
+            if not session.dry_run and destinations:
+                failed_dirs = set()
+                for destination_dir, spec in destinations.items():
+                    if self._ensure_dir(destination_dir, *spec):
+                        root.created_dirs.add(destination_dir)
+                    else:
+                        failed_dirs.add(destination_dir)
+                if failed_dirs:
+                    failed = [t for t in tasks if t.destination_dir in failed_dirs]
+                    for task in failed:
+                        self._record_failure(task.entry.path, f"could not create {task.destination_dir}")
+                    root.advance(len(failed), sum(t.entry.size for t in failed))
+                    tasks = [t for t in tasks if t.destination_dir not in failed_dirs]
+
+            with self.metrics.timer("move"):
+                self._move_tasks(tasks, executor, root, root.on_moved, dry_run=session.dry_run)
+
+    def _save_listing_snapshot(self, root: _RootRun, listing: DirListing, first_index: int) -> None:
+        remaining = list(listing.unchanged) + [
+            entry
+            for offset, entry in enumerate(listing.entries)
+            if first_index + offset not in root.moved_indices
+        ]
+        root.moved_indices.difference_update(range(first_index, first_index + len(listing.entries)))
+        self._save_snapshot(listing.path, remaining, listing.ignored, listing.subdirs)
+
+    def can_undo(self) -> bool:
+        if self.undo_log:
+            return True
+        return self.journal is not None and self.journal.find() is not None
+
+    def resume(self, job_id: str | None = None, *, control=None) -> RunResult | None:
+        """Continue an interrupted run, by default the most recent one.
+
+        Folders the checkpoint marks finished are not read again; the folder
+        that was in progress is rescanned, so files already moved out of it
+        are simply not found and nothing is moved twice.
+        """
+        state = self.checkpoints.find(job_id) if self.checkpoints is not None else None
+        if state is None:
+            self._log("No interrupted job to resume.", level="SKIP")
+            return None
+        self._log(
+            f"Resuming job {state.job_id} from {state.started}: "
+            f"{len(state.finished_dirs)} folders already done.",
+            level="INFO",
+        )
+        return self.run(state.job, **state.options, resume=state, control=control)
+
+    def apply_plan(self, path: str, *, verify: bool = True, control=None) -> RunResult:
+        """Carry out a plan saved by a dry run.
+
+        With ``verify``, a file whose size or modification time changed since
+        the plan was made is skipped. A destination that has been taken in the
+        meantime gets the next free name, as in a normal run.
+        """
+        self._control = control
+        self._update_progress(0)
+        self.metrics = JobMetrics()
+        result = RunResult()
+        try:
+            plan = read_plan(path)
+        except (OSError, ValueError) as err:
+            self._log(f"Failed to read plan {path}: {err}", level="ERROR")
+            return result
+        with plan:
+            items = iter(plan)
+            try:
+                first = next(items, None)
+            except (OSError, ValueError) as err:
+                self._log(f"Failed to read plan {path}: {err}", level="ERROR")
+                return result
+            if first is None:
+                self._log("The plan has nothing to do.", level="SKIP")
+                self._publish_metrics()
+                return result
+
+            self._log(f"--- Applying plan {path} ---", level="INFO")
+            roots = list(plan.header.get("roots", []))
+            session = _MoveSession(self, roots, dry_run=False, track_snapshots=False)
+            self._begin_stats("apply", session.roots)
+            session.start_moving()
+            complete, cancelled = True, False
+            try:
+                # Items are read as they are applied; a damaged record stops the
+                # run there, with every move so far in the undo journal.
+                for index, item in enumerate(itertools.chain((first,), items)):
+                    self._checkpoint()
+                    result.queued += 1
+                    started = time.perf_counter()
+                    move = self._apply_item(item, verify=verify)
+                    if move:
+                        self.metrics.observe_move(time.perf_counter() - started, item.source)
+                        if len(move) == 2:
+                            self.metrics.count_move(item.category, item.size)
+                        session.record(index, move)
+                    self._update_progress(plan.fraction)
+            except ValueError as err:
+                self._log(f"Stopped applying {path}: {err}", level="ERROR")
+                complete = False
+            except JobCancelled:
+                cancelled = True
+                raise
+            finally:
+                if session.writer is not None:
+                    session.writer.close()
+                self.undo_log = session.undo_log()
+                self._save_hash_cache()
+                if cancelled:
+                    self._publish_metrics("cancelled")
+
+        result.moved = session.moved
+        self._log_copy_stats()
+        if complete:
+            self._log(f"Plan applied. {result.moved} files moved.", level="SUCCESS")
+        else:
+            self._log(f"Plan partly applied. {result.moved} files moved.", level="INFO")
+        self._set_phase("done")
+        self._set_status_text("Done")
+        self._publish_metrics()
+        return result
+
+    def _apply_item(self, item: PlanItem, *, verify: bool) -> tuple[str, ...] | None:
+        filename = os.path.basename(item.source)
+        try:
+            info = os.stat(item.source)
+        except OSError:
+            self.metrics.count("files_skipped")
+            self._log(f"Skipped {filename}: no longer at {os.path.dirname(item.source)}", level="SKIP")
+            return None
+        if verify and (info.st_size != item.size or info.st_mtime_ns != item.mtime_ns):
+            self.metrics.count("files_skipped")
+            self._log(f"Skipped {filename}: changed since the plan was made", level="SKIP")
+            return None
+
+        destination_dir = os.path.dirname(item.destination)
+        if item.action != "move":
+            label = os.path.join(item.category, os.path.basename(item.destination))
+            if not self._is_duplicate(item.source, item.destination):
+                self.metrics.count("files_skipped")
+                self._log(f"Skipped {filename}: no longer a duplicate of {label}", level="SKIP")
+                return None
+            return self._handle_duplicate(
+                item.source, item.destination, label, dry_run=False, policy=item.action
+            )
+
+        extension = os.path.splitext(filename)[1].lower()
+        if not self._ensure_dir(destination_dir, item.category, extension, False):
+            self._record_failure(item.source, f"could not create {destination_dir}")
+            return None
+        try:
+            self.mover.move(item.source, item.destination)
+        except FileExistsError:
+            return self._move_file(item.source, destination_dir, item.category, dry_run=False)
+        except OSError as err:
+            self._record_failure(item.source, str(err))
+            self._log(f"Failed to move {filename}: {err}", level="ERROR")
+            return None
+        candidate = os.path.basename(item.destination)
+        target = item.category if candidate == filename else f"{item.category} as {candidate}"
+        self._log(f"Moved {filename} -> {target}", level="SUCCESS")
+        return item.destination, item.source
+
+    def undo(self, session_id: str | None = None, *, control=None) -> int:
+        """Move the files of a session back, by default the last one.
+
+        Moves are only kept in ``undo_log`` when the last real run could not
+        write a journal, so a non-empty log is always the newest session.
+        """
+        self._control = control
+        session = None
+        if session_id is None and self.undo_log:
+            total = len(self.undo_log)
+            to_restore = (
+                (move[0], move[1], idx / total, move[2] if len(move) > 2 else None)
+                for idx, move in enumerate(reversed(self.undo_log), start=1)
+            )
+        elif self.journal is not None:
+            session = self.journal.find(session_id)
+            if session is None:
+                return 0
+            to_restore = self.journal.replay(session)
+        else:
+            return 0
+        self._set_phase("moving")
+        self._set_status_text("Undo in progress...")
+        restored = 0
+        for current_path, original_path, fraction, kind in to_restore:
+            self._checkpoint()
+            if not os.path.exists(current_path):
+                self._log(f"Undo skipped: {current_path} missing.", level="SKIP")
+                continue
+            try:
+                os.makedirs(os.path.dirname(original_path), exist_ok=True)
+                if kind == "dup":
+                    self.mover.link_or_copy(current_path, original_path)
+                else:
+                    self.mover.move(current_path, original_path)
+                restored += 1
+                self._log(f"Restored {os.path.basename(original_path)}", level="SUCCESS")
+            except FileExistsError:
+                self._log(f"Undo skipped: {original_path} already exists.", level="SKIP")
+            except OSError as err:
+                self._log(f"Undo failed for {original_path}: {err}", level="ERROR")
+            self._update_progress(fraction)
+        self._log_copy_stats()
+        if session is not None:
+            self.journal.discard(session)
+        self.undo_log = MoveLog()
+        self._set_phase("done")
+        self._set_status_text("Undo complete.")
+        return restored
+
+    def organize_files(
+        self,
+        folder_path: str,
+        names,
+        *,
+        skip_exts=(),
+        dry_run: bool = False,
+        writer=None,
+    ) -> int:
+        skip_set = {ext.lower() for ext in skip_exts}
+        protected_names = _protected_names(folder_path, self._protected_paths())
+        if not self.compile_rules():
+            return 0
+        moved = 0
+        for name in names:
+            if name in protected_names or os.path.splitext(name)[1].lower() in skip_set:
+                continue
+            move = self.process_file(os.path.join(folder_path, name), folder_path, dry_run=dry_run)
+            if move and not dry_run:
+                moved += 1
+                if writer is not None:
+                    writer.record(*move)
+                else:
+                    self.undo_log.append(move)
+        self._save_hash_cache()
+        return moved
+
+    def process_file(self, source_path: str, folder_path: str, *, dry_run: bool) -> tuple[str, ...] | None:
+        try:
+            info = os.stat(source_path)
+        except OSError:
+            return None
+        if not stat.S_ISREG(info.st_mode):
+            return None
+
+        filename = os.path.basename(source_path)
+        extension = os.path.splitext(filename)[1].lower()
+        category, dynamic_folder = self.category_for(filename, info.st_size, info.st_mtime_ns, source_path)
+        destination_dir = os.path.join(folder_path, category)
+        if not dry_run and not self._ensure_dir(destination_dir, category, extension, dynamic_folder):
+            return None
+        return self._move_file(source_path, destination_dir, category, dry_run=dry_run)
+
+    def _move_tasks(self, tasks: list[MoveTask], executor, progress, on_moved, *, dry_run: bool) -> None:
+        # Files that could claim the same destination name (``r.txt`` may fall
+        # back to ``r (1).txt``, which another source file may be called)
+        # always land in the same lane, so collision handling sees them in
+        # scan order no matter how many workers run.
+        if executor is None or len(tasks) < 2:
+            lanes = [tasks]
+        else:
+            lanes = [[] for _ in range(self.workers)]
+            for task in tasks:
+                key = os.path.join(task.destination_dir, collision_stem(task.entry.name))
+                lane = zlib.crc32(key.casefold().encode("utf-8", "surrogatepass")) % self.workers
+                lanes[lane].append(task)
+
+        metrics = self.metrics
+
+        def run_lane(lane: list[MoveTask]) -> None:
+            for task in lane:
+                self._checkpoint()
+                started = time.perf_counter()
+                move = self._move_file(
+                    task.entry.path, task.destination_dir, task.category, dry_run=dry_run, entry=task.entry
+                )
+                if move and not dry_run:
+                    metrics.observe_move(time.perf_counter() - started, task.entry.path)
+                    if len(move) == 2:
+                        metrics.count_move(task.category, task.entry.size)
+                    on_moved(task.index, move)
+                progress.advance(1, task.entry.size, task.category)
+
+        if len(lanes) == 1:
+            run_lane(lanes[0])
+            return
+        for future in [executor.submit(run_lane, lane) for lane in lanes if lane]:
+            future.result()
+
+    def _save_snapshot(
+        self, folder_path: str, entries: list[ScanEntry], ignored_names: list[str], subdirs: list[str]
+    ) -> None:
+        try:
+            self.snapshots.save(folder_path, entries, ignored_names, subdirs)
+        except OSError as err:
+            self._log(f"Failed to save index for {folder_path}: {err}", level="ERROR")
+
+    def _ensure_dir(self, destination_dir: str, category: str, extension: str, dynamic_folder: bool) -> bool:
+        if os.path.isdir(destination_dir):
+            return True
+        try:
+            os.makedirs(destination_dir, exist_ok=True)
+        except OSError as err:
+            self._log(f"Failed to create {category}: {err}", level="ERROR")
+            return False
+        self.metrics.count("dirs_created")
+        if dynamic_folder:
+            label = extension.upper() if extension else "(no extension)"
+            self._log(f"Created {category} for {label}", level="INFO")
+            if self._run_stats is not None:
+                self._record_stats(self._run_stats.dynamic_folder, destination_dir, extension)
+        return True
+
+    def _record_failure(self, path: str, error: str) -> None:
+        self.metrics.count("files_failed")
+        if self._run_stats is not None:
+            self._record_stats(self._run_stats.failure, path, error)
+
+    def _begin_stats(self, kind: str, roots) -> None:
+        self._run_stats = None
+        if self.stats is not None:
+            try:
+                self._run_stats = self.stats.begin(kind, roots)
+            except STATS_ERRORS as err:
+                self._log(f"Run statistics unavailable: {err}", level="ERROR")
+
+    def _record_stats(self, record, *args) -> None:
+        try:
+            record(*args)
+        except STATS_ERRORS as err:
+            # Statistics are best effort; a locked or broken index must not stop a run.
+            self._run_stats = None
+            self._log(f"Run statistics disabled for this run: {err}", level="ERROR")
+
+    def _move_file(
+        self,
+        source_path: str,
+        destination_dir: str,
+        category: str,
+        *,
+        dry_run: bool,
+        entry: ScanEntry | None = None,
+    ) -> tuple[str, ...] | None:
+        filename = os.path.basename(source_path)
+        for candidate in collision_names(filename):
+            destination_path = os.path.join(destination_dir, candidate)
+            target = category if candidate == filename else f"{category} as {candidate}"
+            try:
+                if dry_run:
+                    if os.path.lexists(destination_path) or (
+                        self.plan is not None and not self.plan.reserve(destination_path)
+                    ):
+                        raise FileExistsError(destination_path)
+                    if self.plan is None:
+                        self._log(f"[DRY] {filename} -> {target}", level="SUCCESS")
+                    else:
+                        item = self._plan_item(source_path, destination_path, category, "move", entry)
+                        self.plan.add(item)
+                    return None
+                self.mover.move(source_path, destination_path)
+                self._log(f"Moved {filename} -> {target}", level="SUCCESS")
+                return destination_path, source_path
+            except FileExistsError:
+                if self._is_duplicate(source_path, destination_path):
+                    label = os.path.join(category, candidate)
+                    return self._handle_duplicate(
+                        source_path, destination_path, label, dry_run=dry_run, entry=entry
+                    )
+            except FileNotFoundError:
+                if os.path.lexists(source_path):
+                    self._record_failure(source_path, "destination missing")
+                    self._log(f"Failed to move {filename}: destination missing", level="ERROR")
+                else:
+                    self.metrics.count("files_skipped")
+                return None
+            except PermissionError as err:
+                self._record_failure(source_path, str(err))
+                self._log(f"Access Denied: {filename}", level="ERROR")
+                return None
+            except OSError as err:
+                self._record_failure(source_path, str(err))
+                self._log(f"Failed to move {filename}: {err}", level="ERROR")
+                return None
+        self.metrics.count("files_skipped")
+        self._log(f"Skipped {filename}: no free name left in {category}", level="SKIP")
+        return None
+
+    def _is_duplicate(self, source_path: str, destination_path: str) -> bool:
+        try:
+            if not os.path.isfile(destination_path):
+                return False
+            return self.comparer.same_content(source_path, destination_path)
+        except OSError:
+            return False
+
+    def _handle_duplicate(
+        self,
+        source_path: str,
+        destination_path: str,
+        label: str,
+        *,
+        dry_run: bool,
+        entry: ScanEntry | None = None,
+        policy: str | None = None,
+    ) -> tuple[str, ...] | None:
+        filename = os.path.basename(source_path)
+        policy = policy or self.duplicates
+        self.metrics.count("duplicates")
+        if policy == "keep":
+            self.metrics.count("files_skipped")
+            self._log(f"Skipped {filename}: duplicate of {label}", level="SKIP")
+            return None
+        if dry_run:
+            if self.plan is not None:
+                category = os.path.dirname(label)
+                self.plan.add(self._plan_item(source_path, destination_path, category, policy, entry))
+                return None
+            action = "remove it" if policy == "delete" else "hardlink it"
+            self._log(f"[DRY] {filename} is a duplicate of {label}, would {action}", level="SUCCESS")
+            return None
+        try:
+            if policy == "delete":
+                os.unlink(source_path)
+                self._log(f"Removed duplicate {filename} (same as {label})", level="SUCCESS")
+                return destination_path, source_path, "dup"
+            if os.path.samefile(source_path, destination_path):
+                self.metrics.count("files_skipped")
+                self._log(f"Skipped {filename}: already linked to {label}", level="SKIP")
+                return None
+            temp_path = os.path.join(os.path.dirname(source_path), f".{filename}.fo-link")
+            os.link(destination_path, temp_path)
+            try:
+                os.replace(temp_path, source_path)
+            except OSError:
+                os.unlink(temp_path)
+                raise
+            self._log(f"Hardlinked duplicate {filename} to {label}", level="SUCCESS")
+        except OSError as err:
+            self._record_failure(source_path, str(err))
+            self._log(f"Failed to deduplicate {filename}: {err}", level="ERROR")
+        return None
+
+    def _plan_item(
+        self, source_path: str, destination_path: str, category: str, action: str, entry: ScanEntry | None
+    ) -> PlanItem:
+        if entry is not None:
+            size, mtime_ns = entry.size, entry.mtime_ns
+        else:
+            try:
+                info = os.stat(source_path)
+                size, mtime_ns = info.st_size, info.st_mtime_ns
+            except OSError:
+                size = mtime_ns = 0
+        return PlanItem(source_path, destination_path, size, mtime_ns, category, action)
+
+    def _close_plan(self, plan: MovePlan, completed: bool) -> None:
+        try:
+            if completed:
+                plan.close()
+            else:
+                plan.discard()
+        except OSError as err:
+            self._log(f"Failed to write plan to {plan.path}: {err}", level="ERROR")
+
+    def _log_plan_summary(self, plan: MovePlan) -> None:
+        self._log(
+            f"Dry run: {plan.files} files ({format_size(plan.bytes)}) would be moved.", level="INFO"
+        )
+        for category, (files, size) in sorted(plan.by_category.items(), key=lambda pair: -pair[1][0]):
+            self._log(f"  {category}: {files} files, {format_size(size)}", level="INFO")
+        for action, count in sorted(plan.duplicates.items()):
+            verb = "removed" if action == "delete" else "hardlinked"
+            self._log(f"  {count} duplicates would be {verb}.", level="INFO")
+        if plan.path:
+            self._log(f"Plan saved to {plan.path}", level="INFO")
+
+    def _save_hash_cache(self) -> None:
+        try:
+            self.comparer.cache.save()
+        except OSError as err:
+            self._log(f"Failed to save hash cache: {err}", level="ERROR")
+
+    def _log_copy_stats(self) -> None:
+        stats = self.mover.take_stats()
+        self.metrics.count("bytes_copied", stats.bytes)
+        if stats.files:
+            self._log(
+                f"Copied {stats.files} files across devices: {format_size(stats.bytes)} "
+                f"at {format_size(stats.bytes_per_second)}/s.",
+                level="INFO",
+            )
+
+    def prune(self, folder_path: str, *, control=None) -> int:
+        """Remove every empty folder below ``folder_path``, as a job of its own."""
+        self._control = control
+        self._set_phase("scanning")
+        self._set_status_text("Looking for empty folders...")
+        candidates = []
+        for path, _, _ in os.walk(folder_path):
+            self._checkpoint()
+            candidates.append(path)
+        self._set_phase("moving")
+        removed = self.prune_empty_dirs(folder_path, candidates)
+        self._log(f"Removed {removed} empty folders from {folder_path}.", level="SUCCESS")
+        self._set_phase("done")
+        self._set_status_text("Done")
+        return removed
+
+    def prune_empty_dirs(self, base_folder: str, candidates) -> int:
+        """Remove the given folders and then their parents while they are empty.
+
+        ``candidates`` are the folders files were moved out of (plus any the
+        scan already listed); nothing else is visited. ``os.rmdir`` failing
+        with ENOTEMPTY is the emptiness test, so no folder is ever listed.
+        ``base_folder`` itself is never removed.
+        """
+        base = os.path.abspath(base_folder)
+        removed = 0
+        # Deepest first, so a parent is only tried after its children.
+        for path in sorted({os.path.abspath(path) for path in candidates}, key=len, reverse=True):
+            self._checkpoint()
+            while path.startswith(base + os.sep):
+                try:
+                    os.rmdir(path)
+                except OSError:
+                    break
+                removed += 1
+                self._log(f"Removed empty folder: {path}", level="INFO")
+                path = os.path.dirname(path)
+        return removed
+
+    # endregion
+
+    # region Helpers
+    def _checkpoint(self) -> None:
+        """Block while the current job is paused; raise ``JobCancelled`` once cancelled."""
+        if self._control is not None:
+            self._control.checkpoint()
+
+    def apply_settings(self, settings: dict) -> bool:
+        """Take over rules and tuning from a (re)loaded settings dict.
+
+        Every value is checked before any is taken over: a ``ValueError`` or
+        ``TypeError`` leaves the engine on its previous settings.
+        """
+        custom_rules = settings.get("custom_rules") or {}
+        if not isinstance(custom_rules, dict):
+            raise TypeError("custom_rules must be an object mapping extensions to folders")
+        rules = settings.get("rules") or []
+        if not isinstance(rules, list):
+            raise TypeError("rules must be a list of rule objects")
+        workers = _setting_count(settings, "move_workers", self.workers)
+        root_workers = _setting_count(settings, "root_workers", self.root_workers)
+        per_device = _setting_count(settings, "per_device", self.per_device)
+        self.custom_rules = {str(ext).lower(): str(folder) for ext, folder in custom_rules.items()}
+        self.rules = list(rules)
+        duplicates = settings.get("duplicates", self.duplicates)
+        self.duplicates = duplicates if duplicates in DUPLICATE_POLICIES else "keep"
+        self.workers, self.root_workers, self.per_device = workers, root_workers, per_device
+        self.metrics_path = settings.get("metrics_file", self.metrics_path)
+        if bool(settings.get("sniff_content", self.sniffer is not None)) != (self.sniffer is not None):
+            self.sniffer = ContentSniffer(self.comparer.cache) if self.sniffer is None else None
+        return self.compile_rules()
+
+    def compile_rules(self) -> bool:
+        # One merged table per compile, instead of two lookups per file.
+        self._extension_table = {**MASTER_EXTENSION_MAP, **self.custom_rules}
+        try:
+            self._ruleset = RuleSet.compile(
+                self.rules,
+                self.custom_rules,
+                on_error=lambda err: self._log(f"Invalid rule skipped: {err}", level="ERROR"),
+            )
+        except RuleError as err:
+            self._log(f"Invalid rule: {err}", level="ERROR")
+            self._ruleset = RuleSet.compile((), self.custom_rules)
+            return False
+        return True
+
+    def category_for(
+        self, filename: str, size: int = 0, mtime_ns: int = 0, path: str | None = None
+    ) -> tuple[str, bool]:
+        if self._ruleset is None:
+            self.compile_rules()
+        if self._ruleset:
+            rule = self._ruleset.match(filename, size, mtime_ns)
+            if rule is not None:
+                return rule.folder, False
+        extension = os.path.splitext(filename)[1].lower()
+        category, dynamic_folder = self.category_for_extension(extension)
+        if self.sniffer is not None and path is not None:
+            if dynamic_folder:
+                sniffed = self.sniffer.category(path)
+            elif extension not in self.custom_rules:
+                # A built-in extension only gives way to an unambiguous
+                # signature, e.g. a PNG saved as .pdf goes to Images.
+                sniffed = self.sniffer.category(path, confident_only=True)
+            else:
+                sniffed = None
+            if sniffed is not None:
+                return sniffed, False
+        return category, dynamic_folder
+
+    def category_for_extension(self, extension: str) -> tuple[str, bool]:
+        if self._extension_table is None:
+            self.compile_rules()
+        category = self._extension_table.get(extension)
+        if category:
+            return category, False
+
+        if extension:
+            return f"{extension[1:].upper()}_Files", True
+        return "No_Extension_Files", True
+
+    def _output_folder_names(self) -> set[str]:
+        names = set(MASTER_CATEGORIES) | {"No_Extension_Files"}
+        if self._ruleset is not None:
+            names.update(rule.folder.replace("\\", "/").split("/")[0] for rule in self._ruleset.rules)
+        return names
+
+    def _protected_paths(self) -> set[str]:
+        try:
+            names = os.listdir(APP_DIR)
+        except OSError:
+            names = []
+        protected = {os.path.join(APP_DIR, name) for name in names if name.endswith(".py")}
+        protected.add(os.path.join(APP_DIR, "main.exe"))
+        return protected
+
+    def _set_phase(self, phase: str) -> None:
+        self._on_phase(phase)
+
+    def _set_status_text(self, text: str) -> None:
+        self._on_status(text)
+
+    def _report_progress(self, report: ProgressReport) -> None:
+        if report.files_done and report.fraction < 1.0:
+            eta = format_duration(report.eta_seconds) if report.eta_seconds is not None else "--"
+            self._set_status_text(
+                f"Moving files... {report.files_done}/{report.files_found} files, "
+                f"{format_size(report.bytes_per_second)}/s, {report.files_per_second:.0f} files/s, ETA {eta}"
+            )
+        self._on_report(report)
+
+    def _update_progress(self, value: float) -> None:
+        self._on_progress(max(0.0, min(1.0, value)))
+
+    def _log(self, message: str, *, level: str = "INFO") -> None:
+        self._on_log(message, level)
+
+    # endregion
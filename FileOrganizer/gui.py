@@ -0,0 +1,834 @@
+import json
+import os
+import threading
+import tkinter.filedialog as fd
+import tkinter.messagebox as mb
+from collections import deque
+
+import customtkinter as ctk
+
+from checkpoint import CheckpointStore
+from dedupe import HashCache
+from engine import (
+    DATA_DIR,
+    MASTER_CATEGORIES,
+    MASTER_EXTENSION_MAP,
+    STANDARD_USER_FOLDERS,
+    OrganizerEngine,
+    bulk_job,
+    format_log,
+    format_size,
+)
+from journal import UndoJournal
+from rules import RuleError, RuleSet
+from scheduler import PRIORITY_BACKGROUND, PRIORITY_INTERACTIVE, PRIORITY_NORMAL, JobScheduler
+from settings import SettingsStore, export_rule_set, read_rule_set
+from snapshot import SnapshotIndex
+from sniffer import ContentSniffer
+from stats import StatsIndex
+from ui_events import UiEventChannel
+from watcher import FolderWatcher
+
+
+class FileOrganizerApp(ctk.CTk):
+    SETTINGS_FILE = os.path.join(os.path.dirname(__file__), "settings.json")
+    PLAN_FILE = os.path.join(DATA_DIR, "last_plan.jsonl")
+    MASTER_CATEGORIES = MASTER_CATEGORIES
+    MASTER_EXTENSION_MAP = MASTER_EXTENSION_MAP
+    STANDARD_USER_FOLDERS = STANDARD_USER_FOLDERS
+    UI_TICK_MS = 75
+    SETTINGS_POLL_MS = 2000
+    MAX_LOG_LINES = 5000
+
+    def __init__(self):
+        super().__init__()
+        ctk.set_appearance_mode("dark")
+        ctk.set_default_color_theme("dark-blue")
+
+        self.events = UiEventChannel(self.MAX_LOG_LINES)
+        self._log_line_count = 0
+        self._log_hidden_count = 0
+        self._pending_log: deque[str] = deque(maxlen=self.MAX_LOG_LINES)
+        self._pending_dropped = 0
+
+        self.title("FileOrganizer")
+        self.geometry("840x610")
+        self.resizable(False, False)
+
+        self.store = SettingsStore(
+            self.SETTINGS_FILE,
+            on_error=lambda err: self._log(f"Settings file problem: {err}", level="ERROR"),
+        )
+        self.settings = self.store.data
+        self.engine = OrganizerEngine(
+            self.settings.get("custom_rules", {}),
+            rules=self.settings.get("rules", []),
+            on_log=lambda message, level: self._log(message, level=level),
+            on_progress=self._update_progress,
+            on_report=self._show_report,
+            on_status=self._set_status_text,
+            on_phase=self._set_phase,
+            workers=self.settings.get("move_workers", 1),
+            root_workers=self.settings.get("root_workers", 4),
+            per_device=self.settings.get("per_device", 1),
+            journal=UndoJournal(os.path.join(DATA_DIR, "journal")),
+            snapshots=SnapshotIndex(os.path.join(DATA_DIR, "index")),
+            checkpoints=CheckpointStore(os.path.join(DATA_DIR, "checkpoints")),
+            stats=StatsIndex(os.path.join(DATA_DIR, "stats.sqlite3")),
+            duplicates=self.settings.get("duplicates", "keep"),
+            sniff_content=bool(self.settings.get("sniff_content", False)),
+            metrics_path=self.settings.get("metrics_file"),
+            hash_cache=HashCache(os.path.join(DATA_DIR, "hashes.json")),
+        )
+        self.custom_rules = self.engine.custom_rules
+        self.dry_run_enabled = bool(self.settings.get("dry_run", False))
+        self.delete_empty_enabled = bool(self.settings.get("delete_empty", False))
+        self.incremental_enabled = bool(self.settings.get("incremental", False))
+        self.recursive_enabled = bool(self.settings.get("recursive", False))
+        self.sniff_enabled = bool(self.settings.get("sniff_content", False))
+
+        self.selected_folder = ctk.StringVar(value=self._default_downloads())
+        self.progress_value = ctk.DoubleVar(value=0)
+        self.status_text = ctk.StringVar(value="Idle")
+        self.detail_text = ctk.StringVar(value="")
+
+        self.dry_run_var = ctk.BooleanVar(value=self.dry_run_enabled)
+        self.delete_empty_var = ctk.BooleanVar(value=self.delete_empty_enabled)
+        self.incremental_var = ctk.BooleanVar(value=self.incremental_enabled)
+        self.recursive_var = ctk.BooleanVar(value=self.recursive_enabled)
+        self.sniff_var = ctk.BooleanVar(value=self.sniff_enabled)
+
+        # One job at a time against the engine; the rest wait in priority order.
+        self.scheduler = JobScheduler()
+        self.scheduler.subscribe(self._on_job_event)
+        self.watcher: FolderWatcher | None = None
+        self.watch_thread: threading.Thread | None = None
+        self.watch_var = ctk.BooleanVar(value=False)
+
+        self._build_ui()
+        self.protocol("WM_DELETE_WINDOW", self._on_close)
+        self.after(self.UI_TICK_MS, self._drain_events)
+        self.after(self.SETTINGS_POLL_MS, self._poll_settings)
+        self.after_idle(self._report_interrupted_job)
+
+    def _report_interrupted_job(self) -> None:
+        interrupted = self.engine.checkpoints.find()
+        if interrupted is not None:
+            self._log(
+                f"Job {interrupted.job_id} did not finish. Use Resume Interrupted Job to continue it.",
+                level="INFO",
+            )
+
+    # region UI Construction
+    def _build_ui(self) -> None:
+        header = ctk.CTkLabel(
+            self,
+            text="FileOrganizer",
+            font=ctk.CTkFont(size=28, weight="bold"),
+        )
+        header.pack(pady=(16, 6))
+
+        self.tabview = ctk.CTkTabview(self, command=self._on_tab_change)
+        self.tabview.pack(fill="both", expand=True, padx=20, pady=12)
+        dashboard_tab = self.tabview.add("Dashboard")
+        self.tabview.add("Settings")
+        self.tabview.add("Logs")
+
+        # Only the visible tab is built up front; the others on first use.
+        self.log_box = None
+        self._tab_builders = {"Settings": self._build_settings, "Logs": self._build_logs}
+        self._build_dashboard(dashboard_tab)
+
+    def _on_tab_change(self) -> None:
+        self.build_tab(self.tabview.get())
+
+    def build_tab(self, name: str) -> None:
+        builder = self._tab_builders.pop(name, None)
+        if builder is not None:
+            builder(self.tabview.tab(name))
+
+    def _build_dashboard(self, parent: ctk.CTkFrame) -> None:
+        select_frame = ctk.CTkFrame(parent)
+        select_frame.pack(fill="x", padx=16, pady=(16, 8))
+
+        path_label = ctk.CTkLabel(
+            select_frame,
+            textvariable=self.selected_folder,
+            anchor="w",
+            font=ctk.CTkFont(size=13),
+        )
+        path_label.pack(fill="x", padx=12, pady=12)
+
+        button_frame = ctk.CTkFrame(parent)
+        button_frame.pack(fill="x", padx=16, pady=8)
+
+        self.select_button = ctk.CTkButton(
+            button_frame, text="Select Folder", command=self._select_folder
+        )
+        self.organize_button = ctk.CTkButton(
+            button_frame,
+            text="Organize Folder",
+            fg_color="#43A047",
+            hover_color="#2E7D32",
+            command=lambda: self._start_operation("single"),
+        )
+        self.bulk_button = ctk.CTkButton(
+            button_frame,
+            text="Organize All User Folders",
+            fg_color="#1565C0",
+            hover_color="#0D47A1",
+            command=lambda: self._start_operation("bulk"),
+        )
+        self.undo_button = ctk.CTkButton(
+            button_frame,
+            text="Undo Last Operation",
+            fg_color="#EF6C00",
+            hover_color="#D84315",
+            command=self._start_undo,
+        )
+        self.resume_button = ctk.CTkButton(
+            button_frame,
+            text="Resume Interrupted Job",
+            fg_color="#6A1B9A",
+            hover_color="#4A148C",
+            command=self._start_resume,
+        )
+        self.apply_button = ctk.CTkButton(
+            button_frame,
+            text="Apply Last Dry Run",
+            fg_color="#00838F",
+            hover_color="#006064",
+            command=self._start_apply,
+        )
+        self.prune_button = ctk.CTkButton(
+            button_frame,
+            text="Remove Empty Folders",
+            fg_color="#546E7A",
+            hover_color="#37474F",
+            command=self._start_prune,
+        )
+        self.pause_button = ctk.CTkButton(
+            button_frame,
+            text="Pause",
+            fg_color="#F9A825",
+            hover_color="#F57F17",
+            state="disabled",
+            command=self._toggle_pause,
+        )
+        self.cancel_button = ctk.CTkButton(
+            button_frame,
+            text="Cancel",
+            fg_color="#C62828",
+            hover_color="#8E0000",
+            state="disabled",
+            command=self._cancel_job,
+        )
+
+        self.select_button.grid(row=0, column=0, padx=8, pady=12, sticky="ew")
+        self.organize_button.grid(row=0, column=1, padx=8, pady=12, sticky="ew")
+        self.bulk_button.grid(row=0, column=2, padx=8, pady=12, sticky="ew")
+        self.undo_button.grid(row=1, column=0, padx=8, pady=(0, 12), sticky="ew")
+        self.resume_button.grid(row=1, column=1, padx=8, pady=(0, 12), sticky="ew")
+        self.apply_button.grid(row=1, column=2, padx=8, pady=(0, 12), sticky="ew")
+        self.prune_button.grid(row=2, column=0, padx=8, pady=(0, 12), sticky="ew")
+        self.pause_button.grid(row=2, column=1, padx=8, pady=(0, 12), sticky="ew")
+        self.cancel_button.grid(row=2, column=2, padx=8, pady=(0, 12), sticky="ew")
+        button_frame.grid_columnconfigure((0, 1, 2), weight=1)
+
+        toggle_frame = ctk.CTkFrame(parent)
+        toggle_frame.pack(fill="x", padx=16, pady=8)
+
+        dry_run_switch = ctk.CTkSwitch(
+            toggle_frame,
+            text="Dry Run (preview only)",
+            variable=self.dry_run_var,
+            command=self._toggle_dry_run,
+        )
+        delete_empty_switch = ctk.CTkSwitch(
+            toggle_frame,
+            text="Delete Empty Folders",
+            variable=self.delete_empty_var,
+            command=self._toggle_delete_empty,
+        )
+        incremental_switch = ctk.CTkSwitch(
+            toggle_frame,
+            text="Incremental (skip unchanged)",
+            variable=self.incremental_var,
+            command=self._toggle_incremental,
+        )
+        dry_run_switch.grid(row=0, column=0, padx=12, pady=12, sticky="w")
+        delete_empty_switch.grid(row=0, column=1, padx=12, pady=12, sticky="w")
+        incremental_switch.grid(row=0, column=2, padx=12, pady=12, sticky="w")
+        watch_switch = ctk.CTkSwitch(
+            toggle_frame,
+            text="Watch Folders",
+            variable=self.watch_var,
+            command=self._toggle_watch,
+        )
+        watch_switch.grid(row=1, column=0, padx=12, pady=(0, 12), sticky="w")
+        recursive_switch = ctk.CTkSwitch(
+            toggle_frame,
+            text="Include Subfolders",
+            variable=self.recursive_var,
+            command=self._toggle_recursive,
+        )
+        recursive_switch.grid(row=1, column=1, padx=12, pady=(0, 12), sticky="w")
+        sniff_switch = ctk.CTkSwitch(
+            toggle_frame,
+            text="Detect Type by Content",
+            variable=self.sniff_var,
+            command=self._toggle_sniff,
+        )
+        sniff_switch.grid(row=1, column=2, padx=12, pady=(0, 12), sticky="w")
+
+        progress_frame = ctk.CTkFrame(parent)
+        progress_frame.pack(fill="x", padx=16, pady=8)
+
+        ctk.CTkLabel(
+            progress_frame,
+            text="Progress",
+            anchor="w",
+            font=ctk.CTkFont(size=13, weight="bold"),
+        ).pack(fill="x", padx=12, pady=(12, 4))
+
+        self.progress_bar = ctk.CTkProgressBar(progress_frame)
+        self.progress_bar.pack(fill="x", padx=12, pady=(0, 8))
+        self.progress_bar.set(0)
+
+        self.status_display = ctk.CTkLabel(
+            progress_frame,
+            textvariable=self.status_text,
+            text_color="#B0BEC5",
+        )
+        self.status_display.pack(padx=12, pady=(0, 0), anchor="w")
+        ctk.CTkLabel(
+            progress_frame,
+            textvariable=self.detail_text,
+            text_color="#78909C",
+            font=ctk.CTkFont(size=11),
+        ).pack(padx=12, pady=(0, 12), anchor="w")
+
+        phase_frame = ctk.CTkFrame(parent)
+        phase_frame.pack(fill="x", padx=16, pady=(0, 16))
+        ctk.CTkLabel(
+            phase_frame,
+            text="Status Indicators",
+            font=ctk.CTkFont(size=13, weight="bold"),
+        ).pack(anchor="w", padx=12, pady=(12, 4))
+
+        indicator_frame = ctk.CTkFrame(phase_frame)
+        indicator_frame.pack(fill="x", padx=12, pady=(4, 12))
+
+        self.phase_labels: dict[str, ctk.CTkLabel] = {}
+        for idx, title in enumerate(("Scanning", "Moving", "Done")):
+            label = ctk.CTkLabel(
+                indicator_frame,
+                text=title,
+                fg_color="#424242",
+                corner_radius=6,
+                padx=20,
+                pady=8,
+            )
+            label.grid(row=0, column=idx, padx=8, pady=8, sticky="ew")
+            self.phase_labels[title.lower()] = label
+        indicator_frame.grid_columnconfigure((0, 1, 2), weight=1)
+        self._set_phase("idle")
+
+    def _build_settings(self, parent: ctk.CTkFrame) -> None:
+        info_label = ctk.CTkLabel(
+            parent,
+            text="Power User Settings",
+            font=ctk.CTkFont(size=16, weight="bold"),
+        )
+        info_label.pack(pady=(16, 8))
+
+        rule_frame = ctk.CTkFrame(parent)
+        rule_frame.pack(fill="x", padx=16, pady=8)
+
+        ctk.CTkLabel(rule_frame, text="Custom Rule (Extension → Folder)").pack(
+            anchor="w", padx=12, pady=(12, 4)
+        )
+
+        entry_frame = ctk.CTkFrame(rule_frame, fg_color="transparent")
+        entry_frame.pack(fill="x", padx=12, pady=4)
+        self.custom_ext_entry = ctk.CTkEntry(entry_frame, placeholder_text=".mp4")
+        self.custom_folder_entry = ctk.CTkEntry(entry_frame, placeholder_text="My_Movies")
+        add_rule_button = ctk.CTkButton(
+            entry_frame, text="Add / Update Rule", command=self._add_custom_rule
+        )
+        self.custom_ext_entry.grid(row=0, column=0, padx=6, pady=6, sticky="ew")
+        self.custom_folder_entry.grid(row=0, column=1, padx=6, pady=6, sticky="ew")
+        add_rule_button.grid(row=0, column=2, padx=6, pady=6)
+        entry_frame.grid_columnconfigure((0, 1), weight=1)
+
+        transfer_frame = ctk.CTkFrame(rule_frame, fg_color="transparent")
+        transfer_frame.pack(fill="x", padx=12, pady=(0, 4))
+        ctk.CTkButton(
+            transfer_frame, text="Import Rules...", width=130, command=self._import_rules
+        ).pack(side="left", padx=6)
+        ctk.CTkButton(
+            transfer_frame, text="Export Rules...", width=130, command=self._export_rules
+        ).pack(side="left", padx=6)
+
+        self.rule_list = ctk.CTkTextbox(rule_frame, height=90)
+        self.rule_list.pack(fill="both", expand=True, padx=12, pady=(4, 12))
+        self.rule_list.configure(state="disabled")
+        self._refresh_rule_list()
+
+        advanced_frame = ctk.CTkFrame(parent)
+        advanced_frame.pack(fill="both", expand=True, padx=16, pady=8)
+
+        header_frame = ctk.CTkFrame(advanced_frame, fg_color="transparent")
+        header_frame.pack(fill="x", padx=12, pady=(12, 4))
+        ctk.CTkLabel(
+            header_frame,
+            text="Advanced Rules (JSON: extensions, glob, regex, min_size, max_size, "
+            "older_than_days, newer_than_days, priority)",
+            anchor="w",
+        ).pack(side="left", fill="x", expand=True)
+        ctk.CTkButton(
+            header_frame, text="Save Rules", width=110, command=self._save_advanced_rules
+        ).pack(side="right")
+
+        self.advanced_rules_box = ctk.CTkTextbox(advanced_frame, height=110)
+        self.advanced_rules_box.pack(fill="both", expand=True, padx=12, pady=(4, 12))
+        self.advanced_rules_box.insert("1.0", json.dumps(self.engine.rules, indent=2))
+
+    def _build_logs(self, parent: ctk.CTkFrame) -> None:
+        self.log_box = ctk.CTkTextbox(parent)
+        self.log_box.pack(fill="both", expand=True, padx=16, pady=16)
+        self.log_box.configure(state="disabled")
+        if self._pending_log or self._pending_dropped:
+            lines = list(self._pending_log)
+            self._pending_log.clear()
+            self._append_log(lines, self._pending_dropped)
+            self._pending_dropped = 0
+
+    # endregion
+
+    # region Settings persistence
+    def _save_settings(self) -> None:
+        data = {
+            "custom_rules": self.custom_rules,
+            "rules": self.engine.rules,
+            "dry_run": self.dry_run_enabled,
+            "delete_empty": self.delete_empty_enabled,
+            "incremental": self.incremental_enabled,
+            "recursive": self.recursive_enabled,
+            "duplicates": self.engine.duplicates,
+            "sniff_content": self.sniff_enabled,
+            "metrics_file": self.engine.metrics_path,
+            "move_workers": self.engine.workers,
+            "root_workers": self.engine.root_workers,
+            "per_device": self.engine.per_device,
+        }
+        self.settings.update(data)
+        self.store.update(data)
+
+    def _poll_settings(self) -> None:
+        """Pick up edits made to settings.json while the app is open."""
+        try:
+            if self.store.reload_if_changed():
+                self._apply_reloaded_settings(self.store.data)
+        except (ValueError, TypeError, RuleError) as err:
+            self._log(f"Keeping the previous settings, settings.json is invalid: {err}", level="ERROR")
+        finally:
+            self.after(self.SETTINGS_POLL_MS, self._poll_settings)
+
+    def _apply_reloaded_settings(self, settings: dict) -> None:
+        # The engine checks everything before taking any of it over, so a
+        # rejected file leaves both the engine and self.settings as they were.
+        self.engine.apply_settings(settings)
+        self.settings = settings
+        self.custom_rules = self.engine.custom_rules
+        self.dry_run_enabled = bool(self.settings.get("dry_run", False))
+        self.delete_empty_enabled = bool(self.settings.get("delete_empty", False))
+        self.incremental_enabled = bool(self.settings.get("incremental", False))
+        self.recursive_enabled = bool(self.settings.get("recursive", False))
+        self.sniff_enabled = self.engine.sniffer is not None
+        for var, value in (
+            (self.dry_run_var, self.dry_run_enabled),
+            (self.delete_empty_var, self.delete_empty_enabled),
+            (self.incremental_var, self.incremental_enabled),
+            (self.recursive_var, self.recursive_enabled),
+            (self.sniff_var, self.sniff_enabled),
+        ):
+            var.set(value)
+        self._refresh_rule_views()
+        self._log("Settings reloaded from disk.", level="INFO")
+
+    def _on_close(self) -> None:
+        # A running job stops at its next file; the process exits once it has.
+        watch_thread = self._stop_watch()
+        self.scheduler.cancel()  # also lets a watch batch still queued return
+        if watch_thread is not None:
+            watch_thread.join()  # the watch closes its undo session on the way out
+        self.store.flush()
+        self.destroy()
+
+    # endregion
+
+    # region UI Events
+    def _select_folder(self) -> None:
+        path = fd.askdirectory(initialdir=self.selected_folder.get())
+        if path:
+            self.selected_folder.set(path)
+            self._log(f"Selected folder: {path}", level="SUCCESS")
+
+    def _toggle_dry_run(self) -> None:
+        self.dry_run_enabled = bool(self.dry_run_var.get())
+        self._save_settings()
+        state = "enabled" if self.dry_run_enabled else "disabled"
+        self._log(f"Dry run mode {state}.", level="INFO")
+
+    def _toggle_delete_empty(self) -> None:
+        self.delete_empty_enabled = bool(self.delete_empty_var.get())
+        self._save_settings()
+        state = "enabled" if self.delete_empty_enabled else "disabled"
+        self._log(f"Delete empty folders {state}.", level="INFO")
+
+    def _toggle_incremental(self) -> None:
+        self.incremental_enabled = bool(self.incremental_var.get())
+        self._save_settings()
+        state = "enabled" if self.incremental_enabled else "disabled"
+        self._log(f"Incremental mode {state}.", level="INFO")
+
+    def _toggle_recursive(self) -> None:
+        self.recursive_enabled = bool(self.recursive_var.get())
+        self._save_settings()
+        state = "enabled" if self.recursive_enabled else "disabled"
+        self._log(f"Subfolder organization {state}.", level="INFO")
+
+    def _toggle_sniff(self) -> None:
+        self.sniff_enabled = bool(self.sniff_var.get())
+        self.engine.sniffer = ContentSniffer(self.engine.comparer.cache) if self.sniff_enabled else None
+        self._save_settings()
+        state = "enabled" if self.sniff_enabled else "disabled"
+        self._log(f"Content detection {state}.", level="INFO")
+
+    def _toggle_watch(self) -> None:
+        if not self.watch_var.get():
+            self._stop_watch()
+            return
+        job = [("Selected Folder", self.selected_folder.get(), set())] + bulk_job(self.settings.get("roots"))
+        self.watcher = FolderWatcher(
+            self.engine,
+            job,
+            dry_run=self.dry_run_enabled,
+            on_log=lambda message, level: self._log(message, level=level),
+            run_batch=self._run_watch_batch,
+        )
+        self.watch_thread = threading.Thread(target=self.watcher.run, daemon=True)
+        self.watch_thread.start()
+
+    def _stop_watch(self) -> threading.Thread | None:
+        """Ask the watcher to stop; returns its thread, which exits after the current batch."""
+        thread = self.watch_thread
+        if self.watcher is not None:
+            self.watcher.stop()
+        self.watcher = self.watch_thread = None
+        return thread
+
+    def _add_custom_rule(self) -> None:
+        extension = self.custom_ext_entry.get().strip().lower()
+        folder_name = self.custom_folder_entry.get().strip()
+        if not extension.startswith(".") or len(extension) < 2:
+            self._log("Invalid extension. Use format .ext", level="ERROR")
+            return
+        if not folder_name:
+            self._log("Target folder name cannot be empty.", level="ERROR")
+            return
+        self.custom_rules[extension] = folder_name
+        self.engine.compile_rules()
+        self._save_settings()
+        self._refresh_rule_list()
+        self._log(f"Rule saved: {extension} -> {folder_name}", level="SUCCESS")
+
+    def _save_advanced_rules(self) -> None:
+        text = self.advanced_rules_box.get("1.0", "end").strip() or "[]"
+        try:
+            rules = json.loads(text)
+            if not isinstance(rules, list):
+                raise RuleError("expected a JSON list of rule objects")
+            RuleSet.compile(rules)
+        except (ValueError, RuleError) as err:
+            self._log(f"Rules not saved: {err}", level="ERROR")
+            return
+        self.engine.rules = rules
+        self.engine.compile_rules()
+        self._save_settings()
+        self._log(f"Saved {len(rules)} advanced rules.", level="SUCCESS")
+
+    def _import_rules(self) -> None:
+        path = fd.askopenfilename(filetypes=[("JSON", "*.json"), ("All files", "*.*")])
+        if not path:
+            return
+        try:
+            custom_rules, rules = read_rule_set(path)
+            RuleSet.compile(rules)
+        except (OSError, ValueError, RuleError) as err:
+            self._log(f"Rules not imported: {err}", level="ERROR")
+            return
+        self.custom_rules.update(custom_rules)
+        self.engine.rules = self.engine.rules + [rule for rule in rules if rule not in self.engine.rules]
+        self.engine.compile_rules()
+        self._save_settings()
+        self._refresh_rule_views()
+        self._log(f"Imported {len(custom_rules)} custom and {len(rules)} advanced rules.", level="SUCCESS")
+
+    def _export_rules(self) -> None:
+        path = fd.asksaveasfilename(defaultextension=".json", filetypes=[("JSON", "*.json")])
+        if not path:
+            return
+        try:
+            export_rule_set(path, self.custom_rules, self.engine.rules)
+        except OSError as err:
+            self._log(f"Rules not exported: {err}", level="ERROR")
+            return
+        self._log(f"Rules exported to {path}", level="SUCCESS")
+
+    def _refresh_rule_views(self) -> None:
+        # The Settings tab may not have been built yet.
+        if "Settings" in self._tab_builders:
+            return
+        self._refresh_rule_list()
+        self.advanced_rules_box.delete("1.0", "end")
+        self.advanced_rules_box.insert("1.0", json.dumps(self.engine.rules, indent=2))
+
+    def _refresh_rule_list(self) -> None:
+        lines = ["Current Custom Rules:"]
+        if not self.custom_rules:
+            lines.append("  (none)")
+        else:
+            for ext, folder in sorted(self.custom_rules.items()):
+                lines.append(f"  {ext} -> {folder}")
+        self.rule_list.configure(state="normal")
+        self.rule_list.delete("1.0", "end")
+        self.rule_list.insert("end", "\n".join(lines))
+        self.rule_list.configure(state="disabled")
+
+    # endregion
+
+    # region Operations
+    def _start_operation(self, mode: str) -> None:
+        if mode == "single":
+            path = self.selected_folder.get()
+            if not os.path.isdir(path):
+                self._log("Selected folder is invalid.", level="ERROR")
+                return
+            job = [("Selected Folder", path, set())]
+            summary = "Folder organized successfully."
+            # A folder picked by hand goes ahead of queued bulk runs.
+            name, priority = f"Organize {os.path.basename(path) or path}", PRIORITY_INTERACTIVE
+        else:
+            job = bulk_job(self.settings.get("roots"))
+            summary = f"Organized all {len(job)} folders successfully!"
+            name, priority = "Organize all user folders", PRIORITY_BACKGROUND
+
+        self._submit("organize", name, self._run_operation, job, summary, priority=priority)
+
+    def _start_undo(self) -> None:
+        if self.scheduler.busy:
+            self._log("Wait for queued and running jobs to finish before undoing.", level="SKIP")
+            return
+        if self.watcher is not None:
+            self._log("Stop watching folders before undoing.", level="SKIP")
+            return
+        if not self.engine.can_undo():
+            self._log("No operations to undo.", level="SKIP")
+            return
+        self._submit("undo", "Undo", self._run_undo, priority=PRIORITY_INTERACTIVE)
+
+    def _start_apply(self) -> None:
+        if not os.path.exists(self.PLAN_FILE):
+            self._log("Run a dry run first; there is no plan to apply.", level="SKIP")
+            return
+        self._submit("apply", "Apply last dry run", self._run_apply)
+
+    def _start_resume(self) -> None:
+        # A running job has a checkpoint too; only offer resume when idle.
+        if self.scheduler.busy:
+            self._log("Wait for queued and running jobs to finish before resuming.", level="SKIP")
+            return
+        if self.engine.checkpoints.find() is None:
+            self._log("No interrupted job to resume.", level="SKIP")
+            return
+        self._submit("resume", "Resume interrupted job", self._run_resume)
+
+    def _start_prune(self) -> None:
+        path = self.selected_folder.get()
+        if not os.path.isdir(path):
+            self._log("Selected folder is invalid.", level="ERROR")
+            return
+        name = f"Remove empty folders in {os.path.basename(path) or path}"
+        self._submit("prune", name, self.engine.prune, path)
+
+    def _toggle_pause(self) -> None:
+        job = self.scheduler.current()
+        if job is None:
+            return
+        if job.state == "paused":
+            self.scheduler.resume(job.job_id)
+        else:
+            self.scheduler.pause(job.job_id)
+
+    def _cancel_job(self) -> None:
+        job = self.scheduler.current()
+        if job is not None:
+            self.scheduler.cancel(job.job_id)
+
+    def _submit(self, kind: str, name: str, target, *args, priority: int = PRIORITY_NORMAL) -> None:
+        self.scheduler.submit(
+            kind, lambda control: target(*args, control=control), name=name, priority=priority
+        )
+
+    def _on_job_event(self, event) -> None:
+        # Called on the scheduler thread, like the engine callbacks.
+        if event.kind != "watch" or event.level != "INFO":  # one batch every few seconds
+            self._log(f"{event.name}: {event.message}", level=event.level)
+        self._run_on_ui(self._refresh_job_controls)
+
+    def _run_watch_batch(self, organize):
+        # Called on the watcher thread; waits for the batch's turn on the engine.
+        job = self.scheduler.submit(
+            "watch", lambda control: organize(), name="Watch", priority=PRIORITY_BACKGROUND
+        )
+        self.scheduler.wait(job)
+        if job.state == "cancelled":
+            return None
+        return job.result or 0
+
+    def _run_operation(self, job_definitions, summary_message: str, *, control=None) -> None:
+        result = self.engine.run(
+            job_definitions,
+            dry_run=self.dry_run_enabled,
+            delete_empty=self.delete_empty_enabled,
+            incremental=self.incremental_enabled,
+            recursive=self.recursive_enabled,
+            max_depth=self.settings.get("max_depth"),
+            exclude=self.settings.get("exclude", []),
+            plan_path=self.PLAN_FILE if self.dry_run_enabled else None,
+            control=control,
+        )
+        if result.queued and not result.dry_run:
+            self._show_message("FileOrganizer", summary_message)
+
+    def _run_apply(self, *, control=None) -> None:
+        result = self.engine.apply_plan(self.PLAN_FILE, control=control)
+        if result.moved:
+            try:
+                os.remove(self.PLAN_FILE)
+            except OSError:
+                pass
+            self._show_message("FileOrganizer", f"Dry run applied: {result.moved} files moved.")
+
+    def _run_resume(self, *, control=None) -> None:
+        result = self.engine.resume(control=control)
+        if result is not None and result.queued:
+            self._show_message("FileOrganizer", "Interrupted job finished.")
+
+    def _run_undo(self, *, control=None) -> None:
+        if not self.engine.can_undo():
+            return
+        if self.engine.undo(control=control):
+            self._show_message("FileOrganizer", "Last operation has been undone.")
+        else:
+            self._log("Nothing was restored.", level="SKIP")
+
+    # endregion
+
+    # region Helpers
+    def _default_downloads(self) -> str:
+        downloads = os.path.join(os.path.expanduser("~"), "Downloads")
+        return downloads if os.path.isdir(downloads) else os.getcwd()
+
+    def _refresh_job_controls(self) -> None:
+        job = self.scheduler.current()
+        self.pause_button.configure(
+            state="normal" if job is not None and job.state != "cancelling" else "disabled",
+            text="Continue" if job is not None and job.state == "paused" else "Pause",
+        )
+        self.cancel_button.configure(state="normal" if job is not None else "disabled")
+        if not self.scheduler.busy:
+            self.status_text.set("Idle")
+            self.detail_text.set("")
+            self._apply_phase("idle")
+
+    def _set_phase(self, phase: str) -> None:
+        self.events.phase(phase)
+
+    def _apply_phase(self, phase: str) -> None:
+        active_colors = {
+            "scanning": "#0288D1",
+            "moving": "#FB8C00",
+            "done": "#43A047",
+        }
+        for name, label in self.phase_labels.items():
+            if phase == name:
+                label.configure(fg_color=active_colors.get(name, "#424242"))
+            else:
+                label.configure(fg_color="#424242")
+
+    def _set_status_text(self, text: str) -> None:
+        self.events.status(text)
+
+    def _show_report(self, report) -> None:
+        # The four categories with the most data so far.
+        busiest = sorted(report.categories.items(), key=lambda item: -item[1][1])[:4]
+        self.events.detail(
+            "  ·  ".join(f"{name} {format_size(size)} ({files})" for name, (files, size) in busiest)
+        )
+
+    def _update_progress(self, value: float) -> None:
+        self.events.progress(max(0.0, min(1.0, value)))
+
+    def _log(self, message: str, *, level: str = "INFO") -> None:
+        self.events.log(format_log(message, level))
+
+    def _drain_events(self) -> None:
+        try:
+            batch = self.events.drain()
+            if batch.lines or batch.dropped:
+                self._append_log(batch.lines, batch.dropped)
+            if batch.progress is not None:
+                self.progress_bar.set(batch.progress)
+            if batch.status is not None:
+                self.status_text.set(batch.status)
+            if batch.detail is not None:
+                self.detail_text.set(batch.detail)
+            if batch.phase is not None:
+                self._apply_phase(batch.phase)
+            for func in batch.calls:
+                func()
+        finally:
+            self.after(self.UI_TICK_MS, self._drain_events)
+
+    def _append_log(self, lines: list[str], dropped: int) -> None:
+        if self.log_box is None:  # Logs tab not opened yet
+            overflow = max(0, len(self._pending_log) + len(lines) - self.MAX_LOG_LINES)
+            self._pending_dropped += dropped + overflow
+            self._pending_log.extend(lines)
+            return
+        self.log_box.configure(state="normal")
+        if lines:
+            self.log_box.insert("end", "\n".join(lines) + "\n")
+        self._log_line_count += len(lines)
+        excess = max(0, self._log_line_count - self.MAX_LOG_LINES)
+        if excess or dropped:
+            # The first line is the "more lines" marker once anything was trimmed.
+            remove = excess + (1 if self._log_hidden_count else 0)
+            if remove:
+                self.log_box.delete("1.0", f"{remove + 1}.0")
+            self._log_line_count -= excess
+            self._log_hidden_count += excess + dropped
+            self.log_box.insert("1.0", f"... {self._log_hidden_count} more lines ...\n")
+        self.log_box.see("end")
+        self.log_box.configure(state="disabled")
+
+    def _show_message(self, title: str, message: str) -> None:
+        self._run_on_ui(lambda: mb.showinfo(title, message))
+
+    def _run_on_ui(self, func) -> None:
+        self.events.call(func)
+
+    # endregion
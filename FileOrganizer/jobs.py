@@ -0,0 +1,42 @@
+import threading
+
+
+class JobCancelled(Exception):
+    """Raised at the next file boundary of a job that was cancelled."""
+
+
+class JobControl:
+    """Cancel and pause flags a running job polls between files.
+
+    ``checkpoint`` blocks while the job is paused and raises ``JobCancelled``
+    once it has been cancelled; cancelling a paused job wakes it up.
+    """
+
+    def __init__(self):
+        self._cancelled = False
+        self._running = threading.Event()
+        self._running.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled
+
+    @property
+    def paused(self) -> bool:
+        return not self._running.is_set()
+
+    def cancel(self) -> None:
+        self._cancelled = True
+        self._running.set()
+
+    def pause(self) -> None:
+        if not self._cancelled:
+            self._running.clear()
+
+    def resume(self) -> None:
+        self._running.set()
+
+    def checkpoint(self) -> None:
+        self._running.wait()
+        if self._cancelled:
+            raise JobCancelled()
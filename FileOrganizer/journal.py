@@ -0,0 +1,286 @@
+import json
+import os
+import threading
+import time
+from array import array
+from dataclasses import dataclass, field
+
+JOURNAL_SUFFIX = ".jsonl"
+
+
+@dataclass
+class SessionInfo:
+    session_id: str
+    path: str
+    started: str = ""
+    folders: list[str] = field(default_factory=list)
+    complete: bool = False
+    moved: int | None = None
+
+
+class JournalWriter:
+    """Append-only writer for one session.
+
+    Records are buffered and written every ``batch_size`` moves, or sooner once
+    ``fsync_interval`` seconds have passed since the last fsync; the file is
+    fsync'd at most that often and again on close, so a slow job loses at most
+    the moves of the last ``fsync_interval`` seconds in a crash.
+    """
+
+    def __init__(self, path: str, *, batch_size: int = 256, fsync_interval: float = 2.0):
+        self.path = path
+        self.moved = 0
+        self._batch_size = batch_size
+        self._fsync_interval = fsync_interval
+        self._buffer: list[str] = []
+        self._lock = threading.Lock()
+        self._file = open(path, "a", encoding="utf-8", newline="\n")
+        self._last_sync = time.monotonic()
+
+    def write_header(self, session_id: str, folders: list[str]) -> None:
+        record = {"session": session_id, "started": _timestamp(), "folders": folders}
+        with self._lock:
+            self._buffer.append(json.dumps(record))
+            self._flush(force_sync=True)
+
+    def record(self, destination_path: str, source_path: str, kind: str | None = None) -> None:
+        record = [destination_path, source_path]
+        if kind is not None:
+            record.append(kind)
+        line = json.dumps(record)
+        with self._lock:
+            self._buffer.append(line)
+            self.moved += 1
+            due = time.monotonic() - self._last_sync >= self._fsync_interval
+            if due or len(self._buffer) >= self._batch_size:
+                self._flush()
+
+    def flush(self) -> None:
+        with self._lock:
+            self._flush(force_sync=True)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file.closed:
+                return
+            if self.moved == 0:
+                # Nothing to undo; an empty session must not hide the previous one.
+                self._buffer.clear()
+                self._file.close()
+                try:
+                    os.remove(self.path)
+                except OSError:
+                    pass
+                return
+            self._buffer.append(json.dumps({"end": _timestamp(), "moved": self.moved}))
+            self._flush(force_sync=True)
+            self._file.close()
+
+    def _flush(self, *, force_sync: bool = False) -> None:
+        if self._buffer:
+            self._file.write("\n".join(self._buffer) + "\n")
+            self._buffer.clear()
+            self._file.flush()
+        now = time.monotonic()
+        if force_sync or now - self._last_sync >= self._fsync_interval:
+            os.fsync(self._file.fileno())
+            self._last_sync = now
+
+
+class MoveLog:
+    """In-memory undo log, used when no journal can be written.
+
+    Each ``(destination, source[, kind])`` move is stored as two indices into a
+    table of interned folder paths plus the file name (the destination name
+    only when it differs), so a million moves out of a few folders cost a name
+    and a few array slots each instead of a tuple and two full paths.
+    """
+
+    __slots__ = (
+        "_folders",
+        "_folder_ids",
+        "_kinds",
+        "_sources",
+        "_destinations",
+        "_names",
+        "_renamed",
+        "_kind_ids",
+    )
+
+    def __init__(self):
+        self._folders: list[str] = []
+        self._folder_ids: dict[str, int] = {}
+        self._kinds: list[str | None] = [None]
+        self._sources = array("I")
+        self._destinations = array("I")
+        self._names: list[str] = []
+        self._renamed: dict[int, str] = {}
+        self._kind_ids = array("B")
+
+    def append(self, move: tuple[str, ...]) -> None:
+        destination_dir, destination_name = os.path.split(move[0])
+        source_dir, name = os.path.split(move[1])
+        kind = move[2] if len(move) > 2 else None
+        if kind not in self._kinds:
+            self._kinds.append(kind)
+        if destination_name != name:
+            self._renamed[len(self._names)] = destination_name
+        self._destinations.append(self._folder_id(destination_dir))
+        self._sources.append(self._folder_id(source_dir))
+        self._names.append(name)
+        self._kind_ids.append(self._kinds.index(kind))
+
+    def reordered(self, order) -> "MoveLog":
+        """A copy with the moves in ``order`` (a sequence of positions)."""
+        log = MoveLog()
+        for position in order:
+            log.append(self[position])
+        return log
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def __getitem__(self, index: int) -> tuple[str, ...]:
+        index = range(len(self._names))[index]
+        name = self._names[index]
+        destination = os.path.join(
+            self._folders[self._destinations[index]], self._renamed.get(index, name)
+        )
+        source = os.path.join(self._folders[self._sources[index]], name)
+        kind = self._kinds[self._kind_ids[index]]
+        return (destination, source) if kind is None else (destination, source, kind)
+
+    def __iter__(self):
+        for index in range(len(self._names)):
+            yield self[index]
+
+    def __reversed__(self):
+        for index in reversed(range(len(self._names))):
+            yield self[index]
+
+    def _folder_id(self, folder: str) -> int:
+        folder_id = self._folder_ids.get(folder)
+        if folder_id is None:
+            folder_id = self._folder_ids[folder] = len(self._folders)
+            self._folders.append(folder)
+        return folder_id
+
+
+class UndoJournal:
+    """Directory of per-session JSON-lines files, newest session last."""
+
+    def __init__(self, directory: str, *, max_sessions: int = 50):
+        self.directory = directory
+        self.max_sessions = max_sessions
+
+    def begin(self, folders: list[str]) -> JournalWriter:
+        os.makedirs(self.directory, exist_ok=True)
+        now = time.time()
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(now))
+        base_id = f"{stamp}.{int(now * 1000) % 1000:03d}-{os.getpid()}"
+        session_id = base_id
+        counter = 1
+        while os.path.exists(self._path(session_id)):
+            counter += 1
+            session_id = f"{base_id}-{counter}"
+        writer = JournalWriter(self._path(session_id))
+        writer.write_header(session_id, folders)
+        self._prune()
+        return writer
+
+    def sessions(self) -> list[SessionInfo]:
+        try:
+            names = sorted(os.listdir(self.directory))
+        except OSError:
+            return []
+        sessions = []
+        for name in names:
+            if not name.endswith(JOURNAL_SUFFIX):
+                continue
+            info = self._read_info(os.path.join(self.directory, name))
+            if info is not None:
+                sessions.append(info)
+        return sessions
+
+    def find(self, session_id: str | None = None) -> SessionInfo | None:
+        if session_id is None:
+            # Sessions that finished without moving anything have nothing to undo.
+            sessions = [
+                session for session in self.sessions() if not (session.complete and session.moved == 0)
+            ]
+            return sessions[-1] if sessions else None
+        path = self._path(session_id)
+        return self._read_info(path) if os.path.exists(path) else None
+
+    def replay(self, session: SessionInfo):
+        """Yield ``(current_path, original_path, fraction_done, kind)`` newest move first.
+
+        ``kind`` is ``None`` for a move and ``"dup"`` when the original was
+        removed as a duplicate of ``current_path``.
+        """
+        size = os.path.getsize(session.path) or 1
+        for line, position in _read_lines_reversed(session.path):
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue  # torn final line after a crash
+            if isinstance(record, list) and len(record) in (2, 3):
+                kind = record[2] if len(record) == 3 else None
+                yield record[0], record[1], 1 - position / size, kind
+
+    def discard(self, session: SessionInfo) -> None:
+        try:
+            os.remove(session.path)
+        except OSError:
+            pass
+
+    def _path(self, session_id: str) -> str:
+        return os.path.join(self.directory, session_id + JOURNAL_SUFFIX)
+
+    def _prune(self) -> None:
+        sessions = self.sessions()
+        for session in sessions[: max(0, len(sessions) - self.max_sessions)]:
+            self.discard(session)
+
+    def _read_info(self, path: str) -> SessionInfo | None:
+        session_id = os.path.basename(path)[: -len(JOURNAL_SUFFIX)]
+        info = SessionInfo(session_id, path)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                header = json.loads(f.readline() or "{}")
+        except (OSError, ValueError):
+            return None
+        info.started = header.get("started", "")
+        info.folders = header.get("folders", [])
+        for line, _ in _read_lines_reversed(path):
+            try:
+                footer = json.loads(line)
+            except ValueError:
+                break
+            if isinstance(footer, dict) and "end" in footer:
+                info.complete = True
+                info.moved = footer.get("moved")
+            break
+        return info
+
+
+def _read_lines_reversed(path: str, block_size: int = 65536):
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        position = f.tell()
+        tail = b""
+        while position > 0:
+            read_size = min(block_size, position)
+            position -= read_size
+            f.seek(position)
+            lines = (f.read(read_size) + tail).split(b"\n")
+            tail = lines.pop(0)
+            for line in reversed(lines):
+                if line:
+                    yield line.decode("utf-8", "replace"), position
+        if tail:
+            yield tail.decode("utf-8", "replace"), 0
+
+
+def _timestamp() -> str:
+    return time.strftime("%Y-%m-%dT%H:%M:%S")
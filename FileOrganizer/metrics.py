@@ -0,0 +1,176 @@
+import heapq
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# Upper bounds in seconds, Prometheus-style (each bucket counts moves <= le).
+MOVE_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+COUNTERS = (
+    "dirs_scanned",
+    "files_scanned",
+    "files_unchanged",
+    "files_moved",
+    "files_skipped",
+    "files_failed",
+    "duplicates",
+    "bytes_moved",
+    "bytes_copied",
+    "dirs_created",
+)
+
+
+class JobMetrics:
+    """Counters, phase timers and move latencies for one organize job.
+
+    Phases can interleave (the scan of one folder runs between moves of the
+    previous one), so each phase timer is the total time spent in it. All
+    updates are thread-safe; move workers report into the same instance.
+    """
+
+    def __init__(self, top_n: int = 10):
+        self.top_n = top_n
+        self.started = time.time()
+        self.finished: float | None = None
+        self.counters = dict.fromkeys(COUNTERS, 0)
+        self.phases: dict[str, float] = {}
+        self.roots: dict[str, dict] = {}
+        self.categories: dict[str, list[int]] = {}
+        self.buckets = [0] * (len(MOVE_BUCKETS) + 1)
+        self.move_seconds = 0.0
+        self._slowest: list[tuple[float, str]] = []
+        self._lock = threading.Lock()
+
+    def count(self, name: str, value: int = 1) -> None:
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def count_move(self, category: str, size: int) -> None:
+        """One file moved into ``category``."""
+        with self._lock:
+            self.counters["files_moved"] += 1
+            self.counters["bytes_moved"] += size
+            totals = self.categories.setdefault(category, [0, 0])
+            totals[0] += 1
+            totals[1] += size
+
+    @contextmanager
+    def timer(self, phase: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(phase, time.perf_counter() - started)
+
+    def add_time(self, phase: str, seconds: float) -> None:
+        with self._lock:
+            self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+    def observe_move(self, seconds: float, path: str) -> None:
+        index = next((i for i, bound in enumerate(MOVE_BUCKETS) if seconds <= bound), len(MOVE_BUCKETS))
+        with self._lock:
+            self.buckets[index] += 1
+            self.move_seconds += seconds
+            if len(self._slowest) < self.top_n:
+                heapq.heappush(self._slowest, (seconds, path))
+            elif seconds > self._slowest[0][0]:
+                heapq.heapreplace(self._slowest, (seconds, path))
+
+    def record_root(self, root: str, seconds: float, files: int) -> None:
+        with self._lock:
+            self.roots[root] = {"seconds": round(seconds, 6), "files": files}
+
+    def finish(self) -> None:
+        self.finished = time.time()
+
+    def slowest(self) -> list[tuple[float, str]]:
+        with self._lock:
+            return sorted(self._slowest, reverse=True)
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            histogram = {}
+            running = 0
+            for bound, count in zip(MOVE_BUCKETS + (float("inf"),), self.buckets):
+                running += count
+                histogram["+Inf" if bound == float("inf") else str(bound)] = running
+            return {
+                "started": _iso(self.started),
+                "finished": _iso(self.finished) if self.finished else None,
+                "seconds": round((self.finished or time.time()) - self.started, 6),
+                "counters": dict(self.counters),
+                "phases": {name: round(value, 6) for name, value in self.phases.items()},
+                "roots": dict(self.roots),
+                "categories": {name: list(totals) for name, totals in self.categories.items()},
+                "move_latency": {
+                    "count": sum(self.buckets),
+                    "sum": round(self.move_seconds, 6),
+                    "buckets": histogram,
+                },
+                "slowest": [
+                    {"seconds": round(seconds, 6), "path": path}
+                    for seconds, path in sorted(self._slowest, reverse=True)
+                ],
+            }
+
+    def to_prometheus(self) -> str:
+        data = self.to_dict()
+        lines = [
+            "# HELP fileorganizer_job_seconds Wall time of the last organize job.",
+            "# TYPE fileorganizer_job_seconds gauge",
+            f"fileorganizer_job_seconds {data['seconds']}",
+            "# HELP fileorganizer_last_run_timestamp_seconds When the last organize job finished.",
+            "# TYPE fileorganizer_last_run_timestamp_seconds gauge",
+            f"fileorganizer_last_run_timestamp_seconds {int(self.finished or time.time())}",
+        ]
+        for name, value in data["counters"].items():
+            metric = f"fileorganizer_{name}"
+            lines += [f"# TYPE {metric} gauge", f"{metric} {value}"]
+        lines.append("# TYPE fileorganizer_phase_seconds gauge")
+        lines += [
+            f'fileorganizer_phase_seconds{{phase="{_label(name)}"}} {value}'
+            for name, value in data["phases"].items()
+        ]
+        lines.append("# TYPE fileorganizer_root_seconds gauge")
+        lines += [
+            f'fileorganizer_root_seconds{{root="{_label(root)}"}} {info["seconds"]}'
+            for root, info in data["roots"].items()
+        ]
+        lines.append("# TYPE fileorganizer_category_bytes gauge")
+        lines += [
+            f'fileorganizer_category_bytes{{category="{_label(name)}"}} {size}'
+            for name, (_, size) in data["categories"].items()
+        ]
+        latency = data["move_latency"]
+        lines.append("# TYPE fileorganizer_move_seconds histogram")
+        lines += [
+            f'fileorganizer_move_seconds_bucket{{le="{bound}"}} {count}'
+            for bound, count in latency["buckets"].items()
+        ]
+        lines += [
+            f"fileorganizer_move_seconds_sum {latency['sum']}",
+            f"fileorganizer_move_seconds_count {latency['count']}",
+        ]
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: str) -> None:
+        """Write JSON, or Prometheus text format when ``path`` ends in ``.prom``."""
+        if path.endswith(".prom"):
+            text = self.to_prometheus()
+        else:
+            text = json.dumps(self.to_dict(), indent=2)
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        temp_path = path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8", newline="\n") as f:
+            f.write(text)
+        os.replace(temp_path, path)
+
+
+def _iso(timestamp: float) -> str:
+    return time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(timestamp))
+
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
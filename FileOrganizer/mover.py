@@ -0,0 +1,223 @@
+import ctypes
+import ctypes.util
+import errno
+import os
+import shutil
+import sys
+import threading
+import time
+from dataclasses import dataclass
+
+AT_FDCWD = -100
+RENAME_NOREPLACE = 0x1  # Linux renameat2
+RENAME_EXCL = 0x4  # macOS renamex_np
+COPY_CHUNK = 8 * 1024 * 1024
+_UNSUPPORTED = {errno.EINVAL, errno.ENOSYS, errno.EOPNOTSUPP, errno.ENOTSUP, errno.EPERM}
+
+
+@dataclass
+class CopyStats:
+    files: int = 0
+    bytes: int = 0
+    seconds: float = 0.0
+
+    @property
+    def bytes_per_second(self) -> float:
+        return self.bytes / self.seconds if self.seconds > 0 else 0.0
+
+
+class FileMover:
+    """Moves files without ever replacing an existing destination.
+
+    Moves within one device are a single no-replace rename (``renameat2`` on
+    Linux, ``renamex_np`` on macOS, plain ``os.rename`` on Windows, which
+    already refuses to overwrite), so file data is never read. Moves across
+    devices are detected up front from ``st_dev`` and done as a streamed copy
+    into an exclusively created file, fsync'd and size-checked before the
+    source is deleted. An existing destination raises ``FileExistsError``.
+    """
+
+    def __init__(self, *, chunk_size: int = COPY_CHUNK):
+        self.chunk_size = chunk_size
+        self._devices: dict[str, int] = {}
+        self._stats = CopyStats()
+        self._lock = threading.Lock()
+        self._rename_noreplace = _load_noreplace_rename()
+
+    def move(self, source_path: str, destination_path: str) -> int:
+        """Move one file; returns the number of bytes copied (0 for a rename)."""
+        source_dev = self._device(os.path.dirname(os.path.abspath(source_path)))
+        destination_dev = self._device(os.path.dirname(os.path.abspath(destination_path)))
+        if source_dev is None or source_dev == destination_dev:
+            try:
+                self._rename(source_path, destination_path)
+                return 0
+            except OSError as err:
+                # Bind mounts of one filesystem share st_dev but still refuse renames.
+                if err.errno != errno.EXDEV:
+                    raise
+        return self._copy_and_delete(source_path, destination_path)
+
+    def take_stats(self) -> CopyStats:
+        with self._lock:
+            stats, self._stats = self._stats, CopyStats()
+        return stats
+
+    def _device(self, directory: str) -> int | None:
+        device = self._devices.get(directory)
+        if device is None:
+            try:
+                device = os.stat(directory).st_dev
+            except OSError:
+                return None
+            self._devices[directory] = device
+        return device
+
+    def _rename(self, source_path: str, destination_path: str) -> None:
+        if sys.platform == "win32":
+            os.rename(source_path, destination_path)
+            return
+        if self._rename_noreplace is not None:
+            try:
+                self._rename_noreplace(source_path, destination_path)
+                return
+            except OSError as err:
+                if err.errno not in _UNSUPPORTED:
+                    raise
+        try:
+            # A hard link cannot replace an existing name either.
+            os.link(source_path, destination_path, follow_symlinks=False)
+        except OSError as err:
+            if err.errno not in _UNSUPPORTED and err.errno != errno.EMLINK:
+                raise
+        else:
+            try:
+                os.unlink(source_path)
+            except OSError:
+                os.unlink(destination_path)
+                raise
+            return
+        # Filesystems without links (FAT, some network shares): best effort.
+        if os.path.lexists(destination_path):
+            raise FileExistsError(errno.EEXIST, os.strerror(errno.EEXIST), destination_path)
+        os.rename(source_path, destination_path)
+
+    def link_or_copy(self, source_path: str, destination_path: str) -> None:
+        """Give ``source_path``'s content a second name, sharing the inode when possible."""
+        try:
+            os.link(source_path, destination_path)
+        except FileExistsError:
+            raise
+        except OSError:
+            self._copy(source_path, destination_path, delete_source=False)
+
+    def _copy_and_delete(self, source_path: str, destination_path: str) -> int:
+        return self._copy(source_path, destination_path, delete_source=True)
+
+    def _copy(self, source_path: str, destination_path: str, *, delete_source: bool) -> int:
+        started = time.perf_counter()
+        flags = os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_BINARY", 0)
+        with open(source_path, "rb") as source:
+            before = os.fstat(source.fileno())
+            destination_fd = os.open(destination_path, flags, 0o600)
+            try:
+                try:
+                    copied = _copy_data(source.fileno(), destination_fd, self.chunk_size)
+                    shutil.copystat(source_path, destination_path)
+                    os.fsync(destination_fd)
+                    written = os.fstat(destination_fd).st_size
+                finally:
+                    os.close(destination_fd)
+                after = os.stat(source_path)
+                if written != before.st_size or copied != before.st_size:
+                    raise OSError(errno.EIO, "copy is incomplete", destination_path)
+                if (after.st_size, after.st_mtime_ns) != (before.st_size, before.st_mtime_ns):
+                    raise OSError(errno.EBUSY, "file changed while it was copied", source_path)
+                _fsync_dir(os.path.dirname(os.path.abspath(destination_path)))
+                if delete_source:
+                    os.unlink(source_path)
+            except BaseException:
+                try:
+                    os.unlink(destination_path)
+                except OSError:
+                    pass
+                raise
+        with self._lock:
+            self._stats.files += 1
+            self._stats.bytes += copied
+            self._stats.seconds += time.perf_counter() - started
+        return copied
+
+
+def _copy_data(source_fd: int, destination_fd: int, chunk_size: int) -> int:
+    copied = 0
+    for kernel_copy in _kernel_copies():
+        try:
+            while True:
+                count = kernel_copy(source_fd, destination_fd, chunk_size)
+                if count == 0:
+                    return copied
+                copied += count
+        except OSError as err:
+            # Only fall back if nothing was written yet; both offsets are untouched then.
+            if copied or err.errno not in _UNSUPPORTED | {errno.EXDEV, errno.ENOTTY}:
+                raise
+    read_size = min(chunk_size, 1024 * 1024)
+    while True:
+        data = os.read(source_fd, read_size)
+        if not data:
+            return copied
+        view = memoryview(data)
+        while view:
+            view = view[os.write(destination_fd, view):]
+        copied += len(data)
+
+
+def _kernel_copies():
+    if hasattr(os, "copy_file_range"):
+        yield lambda src, dst, count: os.copy_file_range(src, dst, count)
+    if sys.platform.startswith("linux") and hasattr(os, "sendfile"):
+        yield lambda src, dst, count: os.sendfile(dst, src, None, count)
+
+
+def _fsync_dir(directory: str) -> None:
+    if sys.platform == "win32":
+        return
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _load_noreplace_rename():
+    if sys.platform.startswith("linux"):
+        name, flag = "renameat2", RENAME_NOREPLACE
+    elif sys.platform == "darwin":
+        name, flag = "renamex_np", RENAME_EXCL
+    else:
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        function = getattr(libc, name)
+    except (OSError, AttributeError):
+        return None
+
+    def rename(source_path: str, destination_path: str) -> None:
+        # Raise the event os.rename would, so audit hooks still see the move.
+        sys.audit("os.rename", source_path, destination_path, None, None)
+        source, destination = os.fsencode(source_path), os.fsencode(destination_path)
+        if name == "renameat2":
+            result = function(AT_FDCWD, source, AT_FDCWD, destination, flag)
+        else:
+            result = function(source, destination, flag)
+        if result != 0:
+            code = ctypes.get_errno()
+            raise OSError(code, os.strerror(code), destination_path)
+
+    return rename
@@ -0,0 +1,151 @@
+import json
+import os
+import threading
+import time
+from typing import NamedTuple
+
+PLAN_VERSION = 1
+PLAN_ACTIONS = ("move", "delete", "hardlink")
+
+
+class PlanItem(NamedTuple):
+    source: str
+    destination: str
+    size: int
+    mtime_ns: int
+    category: str
+    action: str = "move"  # or "delete" / "hardlink" for a duplicate of ``destination``
+
+
+class MovePlan:
+    """What a dry run would do: a per-category summary, and optionally every
+    move streamed to a JSON-lines file that ``apply_plan`` can run later.
+
+    The file is written to ``path + ".tmp"`` and renamed on ``close()``, so a
+    plan cut short is never mistaken for a complete one. Destinations are
+    reserved as they are planned, so two files with the same name get
+    different targets just as they would in a real run.
+    """
+
+    def __init__(self, path: str | None = None, *, roots=()):
+        self.path = path
+        self.files = 0
+        self.bytes = 0
+        self.by_category: dict[str, list[int]] = {}
+        self.duplicates: dict[str, int] = {}
+        self._reserved: set[str] = set()
+        self._lock = threading.Lock()
+        self._file = None
+        if path:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self._file = open(path + ".tmp", "w", encoding="utf-8", newline="\n")
+            header = {
+                "plan": PLAN_VERSION,
+                "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "roots": list(roots),
+            }
+            self._file.write(json.dumps(header) + "\n")
+
+    def reserve(self, destination: str) -> bool:
+        """Claim ``destination``; False if an earlier planned move already did."""
+        key = os.path.normcase(destination)
+        with self._lock:
+            if key in self._reserved:
+                return False
+            self._reserved.add(key)
+            return True
+
+    def add(self, item: PlanItem) -> None:
+        with self._lock:
+            if item.action == "move":
+                self.files += 1
+                self.bytes += item.size
+                totals = self.by_category.setdefault(item.category, [0, 0])
+                totals[0] += 1
+                totals[1] += item.size
+            else:
+                self.duplicates[item.action] = self.duplicates.get(item.action, 0) + 1
+            if self._file is not None:
+                self._file.write(json.dumps(list(item)) + "\n")
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is None:
+                return
+            footer = {"end": time.strftime("%Y-%m-%dT%H:%M:%S"), "files": self.files, "bytes": self.bytes}
+            self._file.write(json.dumps(footer) + "\n")
+            self._file.close()
+            self._file = None
+            os.replace(self.path + ".tmp", self.path)
+
+    def discard(self) -> None:
+        with self._lock:
+            if self._file is None:
+                return
+            self._file.close()
+            self._file = None
+            os.remove(self.path + ".tmp")
+
+
+class PlanReader:
+    """A saved plan, read one item at a time so a million-file plan is never
+    held in memory.
+
+    The header is read and checked on open; the footer's totals are merged
+    into it once iteration reaches them. ``fraction`` is how far through the
+    file iteration has got, for progress. Use as a context manager, or
+    iterate to the end, to close the file.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        self._size = max(1, os.fstat(self._file.fileno()).st_size)
+        first = self._file.readline()
+        self._read = len(first)
+        try:
+            header = json.loads(first) if first.strip() else {}
+        except ValueError:
+            header = None
+        if not isinstance(header, dict) or header.get("plan") != PLAN_VERSION:
+            self._file.close()
+            raise ValueError(f"{path} is not a FileOrganizer move plan")
+        self.header = header
+
+    def __iter__(self):
+        try:
+            for line in self._file:
+                self._read += len(line)
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                if isinstance(record, dict):
+                    self.header.update(record)
+                elif (
+                    isinstance(record, list)
+                    and len(record) == len(PlanItem._fields)
+                    and record[5] in PLAN_ACTIONS
+                ):
+                    yield PlanItem(*record)
+                else:
+                    raise ValueError(f"Unexpected plan record: {line[:80].decode('utf-8', 'replace')}")
+        finally:
+            self._file.close()
+
+    @property
+    def fraction(self) -> float:
+        return min(1.0, self._read / self._size)
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __enter__(self) -> "PlanReader":
+        return self
+
+    def __exit__(self, *_exc) -> None:
+        self.close()
+
+
+def read_plan(path: str) -> PlanReader:
+    """Open a saved plan; ``ValueError`` if ``path`` is not one."""
+    return PlanReader(path)
@@ -0,0 +1,300 @@
+import fnmatch
+import re
+import time
+from dataclasses import dataclass, field
+
+_SIZE_UNITS = {
+    "": 1,
+    "B": 1,
+    "KB": 1000,
+    "MB": 1000**2,
+    "GB": 1000**3,
+    "TB": 1000**4,
+    "KIB": 1024,
+    "MIB": 1024**2,
+    "GIB": 1024**3,
+    "TIB": 1024**4,
+}
+_SIZE_PATTERN = re.compile(r"^\s*([0-9]+(?:\.[0-9]+)?)\s*([A-Za-z]*)\s*$")
+_DAY_NS = 86400 * 10**9
+
+
+class RuleError(ValueError):
+    pass
+
+
+def parse_size(value) -> int:
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return int(value)
+    match = _SIZE_PATTERN.match(str(value))
+    if not match or match.group(2).upper() not in _SIZE_UNITS:
+        raise RuleError(f"invalid size: {value!r}")
+    return int(float(match.group(1)) * _SIZE_UNITS[match.group(2).upper()])
+
+
+@dataclass
+class Rule:
+    """One user rule; every predicate that is set must hold for the rule to match."""
+
+    folder: str
+    extensions: tuple[str, ...] = ()
+    glob: str | None = None
+    regex: str | None = None
+    min_size: int | None = None
+    max_size: int | None = None
+    older_than_days: float | None = None
+    newer_than_days: float | None = None
+    priority: int = 0
+    order: int = 0
+    _glob_re: re.Pattern | None = field(default=None, repr=False)
+    _regex_re: re.Pattern | None = field(default=None, repr=False)
+
+    @classmethod
+    def from_dict(cls, data: dict, order: int = 0) -> "Rule":
+        if not isinstance(data, dict):
+            raise RuleError(f"rule {order + 1}: expected an object")
+        folder = str(data.get("folder", "")).strip()
+        if not folder:
+            raise RuleError(f"rule {order + 1}: 'folder' is required")
+        extensions = data.get("extensions", data.get("extension", ()))
+        if isinstance(extensions, str):
+            extensions = [extensions]
+        if not isinstance(extensions, (list, tuple)):
+            raise RuleError(f"rule {order + 1}: 'extensions' must be a list of extensions")
+        normalized = []
+        for ext in extensions:
+            ext = str(ext).strip().lower()
+            if not ext.startswith(".") or len(ext) < 2:
+                raise RuleError(f"rule {order + 1}: invalid extension {ext!r}")
+            normalized.append(ext)
+        for key in ("glob", "regex"):
+            if data.get(key) and not isinstance(data[key], str):
+                raise RuleError(f"rule {order + 1}: {key!r} must be a string, not {data[key]!r}")
+        rule = cls(
+            folder=folder,
+            extensions=tuple(normalized),
+            glob=data.get("glob") or None,
+            regex=data.get("regex") or None,
+            min_size=_size_field(data, "min_size", order),
+            max_size=_size_field(data, "max_size", order),
+            older_than_days=_number_field(data, "older_than_days", order, float),
+            newer_than_days=_number_field(data, "newer_than_days", order, float),
+            priority=_number_field(data, "priority", order, int) or 0,
+            order=order,
+        )
+        try:
+            if rule.glob:
+                rule._glob_re = re.compile(fnmatch.translate(rule.glob), re.IGNORECASE)
+            if rule.regex:
+                rule._regex_re = re.compile(rule.regex, re.IGNORECASE)
+        except re.error as err:
+            raise RuleError(f"rule {order + 1}: {err}") from err
+        if not (rule.extensions or rule.glob or rule.regex or rule.has_stat_predicates):
+            raise RuleError(f"rule {order + 1}: needs at least one condition")
+        return rule
+
+    @property
+    def has_stat_predicates(self) -> bool:
+        return any(
+            value is not None
+            for value in (self.min_size, self.max_size, self.older_than_days, self.newer_than_days)
+        )
+
+    @property
+    def rank(self) -> tuple[int, int, int]:
+        specificity = max((ext.count(".") for ext in self.extensions), default=0)
+        return self.priority, specificity, -self.order
+
+    def matches(self, lower_name: str, size: int, mtime_ns: int, now_ns: int) -> bool:
+        if self.extensions and not lower_name.endswith(self.extensions):
+            return False
+        if self._glob_re is not None and not self._glob_re.match(lower_name):
+            return False
+        if self._regex_re is not None and not self._regex_re.search(lower_name):
+            return False
+        if self.min_size is not None and size < self.min_size:
+            return False
+        if self.max_size is not None and size > self.max_size:
+            return False
+        age_ns = now_ns - mtime_ns
+        if self.older_than_days is not None and age_ns < self.older_than_days * _DAY_NS:
+            return False
+        if self.newer_than_days is not None and age_ns > self.newer_than_days * _DAY_NS:
+            return False
+        return True
+
+
+class RuleSet:
+    """Rules compiled once per job into lookup structures.
+
+    Single extensions live in a dict, compound ones (``.tar.gz``) in a trie
+    keyed on the name's dot-separated parts read from the end. Globs that end
+    in a literal extension (``report_*.pdf``) are bucketed by it; each bucket,
+    and the bucket of remaining globs and regexes, is one alternation ordered
+    by rank, so the first alternative that matches is the best pattern rule.
+    Only rules that have nothing but size/age conditions are tested one by one.
+    """
+
+    def __init__(self, rules: list[Rule], *, now_ns: int | None = None):
+        self.rules = rules
+        self.now_ns = time.time_ns() if now_ns is None else now_ns
+        self.needs_stat = any(rule.has_stat_predicates for rule in rules)
+        self._by_extension: dict[str, list[Rule]] = {}
+        self._suffix_trie: dict = {}
+        self._patterns: dict[str | None, _PatternGroup] = {}
+        self._generic: list[Rule] = []
+        ranked = sorted(rules, key=lambda rule: rule.rank, reverse=True)
+        for rule in ranked:
+            if rule.extensions:
+                for ext in rule.extensions:
+                    parts = ext[1:].split(".")
+                    if len(parts) == 1:
+                        self._by_extension.setdefault(ext, []).append(rule)
+                    else:
+                        node = self._suffix_trie
+                        for part in reversed(parts):
+                            node = node.setdefault(part, {})
+                        node.setdefault(None, []).append(rule)
+            elif rule.glob or rule.regex:
+                key = _glob_extension(rule.glob) if rule.regex is None else None
+                self._patterns.setdefault(key, _PatternGroup()).rules.append(rule)
+            else:
+                self._generic.append(rule)
+        for group in self._patterns.values():
+            group.compile()
+
+    @classmethod
+    def compile(
+        cls,
+        rule_dicts=(),
+        custom_rules: dict[str, str] | None = None,
+        *,
+        now_ns: int | None = None,
+        on_error=None,
+    ) -> "RuleSet":
+        """Compile rule dicts, then ``custom_rules``. An invalid rule raises
+        ``RuleError``, unless ``on_error`` is given: it is then called with the
+        error and only that rule is left out."""
+        rules = []
+        for order, data in enumerate(rule_dicts or ()):
+            try:
+                rules.append(Rule.from_dict(data, order))
+            except RuleError as err:
+                if on_error is None:
+                    raise
+                on_error(err)
+        for ext, folder in (custom_rules or {}).items():
+            rules.append(Rule(folder=folder, extensions=(ext.lower(),), order=len(rules)))
+        return cls(rules, now_ns=now_ns)
+
+    def __bool__(self) -> bool:
+        return bool(self.rules)
+
+    def match(self, name: str, size: int = 0, mtime_ns: int = 0) -> Rule | None:
+        lower_name = name.lower()
+        best: Rule | None = None
+
+        def consider(candidates) -> None:
+            nonlocal best
+            for rule in candidates:
+                if best is not None and rule.rank <= best.rank:
+                    return
+                if rule.matches(lower_name, size, mtime_ns, self.now_ns):
+                    best = rule
+                    return
+
+        dot = lower_name.rfind(".")
+        extension = lower_name[dot:] if dot > 0 else None
+        if extension is not None:
+            consider(self._by_extension.get(extension, ()))
+            if self._suffix_trie and lower_name.count(".") > 1:
+                node = self._suffix_trie
+                for part in reversed(lower_name.split(".")[1:]):
+                    node = node.get(part)
+                    if node is None:
+                        break
+                    consider(node.get(None, ()))
+        if self._patterns:
+            for key in (extension, None) if extension is not None else (None,):
+                group = self._patterns.get(key)
+                if group is not None:
+                    consider(group.candidates(lower_name))
+        if self._generic:
+            consider(self._generic)
+        return best
+
+
+class _PatternGroup:
+    def __init__(self):
+        self.rules: list[Rule] = []
+        self._combined: re.Pattern | None = None
+        self._group_rules: list[tuple[int, Rule]] = []
+
+    def compile(self) -> None:
+        alternatives = []
+        for index, rule in enumerate(self.rules):
+            if rule.regex:
+                body = f"(?s:.*?)(?:{rule.regex})"
+            else:
+                body = fnmatch.translate(rule.glob)
+            alternatives.append(f"(?P<r{index}>{body})")
+        try:
+            combined = re.compile("|".join(alternatives), re.IGNORECASE)
+        except re.error:
+            return  # e.g. numbered backreferences; fall back to one rule at a time
+        self._combined = combined
+        self._group_rules = [
+            (combined.groupindex[f"r{index}"], rule) for index, rule in enumerate(self.rules)
+        ]
+
+    def candidates(self, lower_name: str):
+        if self._combined is None:
+            yield from self.rules
+            return
+        found = self._combined.match(lower_name)
+        if found is None:
+            return
+        for position, (group, rule) in enumerate(self._group_rules):
+            if found.start(group) != -1:
+                yield rule
+                # The alternation only reports the first hit; if that rule
+                # fails a size/age check, fall back to testing the rest.
+                yield from (other for _, other in self._group_rules[position + 1:])
+                return
+
+
+def _glob_extension(glob: str | None) -> str | None:
+    if not glob or "." not in glob:
+        return None
+    tail = glob.rsplit(".", 1)[1]
+    if not tail or any(char in tail for char in "*?[]/\\"):
+        return None
+    return "." + tail.lower()
+
+
+def _number_field(data: dict, key: str, order: int, convert):
+    """``data[key]`` as a number, ``None`` when unset; a ``RuleError`` naming the rule otherwise."""
+    value = data.get(key)
+    if value is None or value == "":
+        return None
+    try:
+        if isinstance(value, bool):
+            raise TypeError(value)
+        number = convert(value)
+    except (TypeError, ValueError, OverflowError):
+        raise RuleError(f"rule {order + 1}: {key!r} must be a number, not {value!r}") from None
+    if number != number:  # NaN
+        raise RuleError(f"rule {order + 1}: {key!r} must be a number, not {value!r}")
+    return number
+
+
+def _size_field(data: dict, key: str, order: int) -> int | None:
+    value = data.get(key)
+    if value is None:
+        return None
+    try:
+        return parse_size(value)
+    except (RuleError, OverflowError, ValueError):
+        raise RuleError(
+            f"rule {order + 1}: {key!r} must be a size like 500KB or 2GB, not {value!r}"
+        ) from None
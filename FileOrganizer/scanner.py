@@ -0,0 +1,284 @@
+import fnmatch
+import os
+import queue
+import re
+import threading
+from array import array
+from dataclasses import dataclass, field
+from typing import NamedTuple
+
+# The folders the engine creates for unknown extensions: ".XYZ" -> "XYZ_Files".
+DYNAMIC_FOLDER_PATTERN = re.compile(r"([^a-z\s]+)_Files")
+
+
+class ScanEntry(NamedTuple):
+    name: str
+    path: str
+    size: int
+    mtime_ns: int
+    inode: int
+
+
+class EntryTable:
+    """The files of one directory, stored column by column.
+
+    Names are kept in a list and sizes, mtimes and inodes in typed arrays
+    (8 bytes each rather than an int object apiece); the full path is only
+    joined when an entry is read back as a ``ScanEntry``. A folder with a
+    million files costs its names plus 24 bytes per file.
+    """
+
+    __slots__ = ("directory", "names", "sizes", "mtimes", "inodes")
+
+    def __init__(self, directory: str = ""):
+        self.directory = directory
+        self.names: list[str] = []
+        self.sizes = array("q")
+        self.mtimes = array("q")
+        self.inodes = array("Q")
+
+    def append(self, name: str, size: int, mtime_ns: int, inode: int) -> None:
+        self.names.append(name)
+        self.sizes.append(size)
+        self.mtimes.append(mtime_ns)
+        # 128-bit file ids (ReFS) do not fit; 0 just makes the file look changed.
+        self.inodes.append(inode if 0 <= inode < 1 << 64 else 0)
+
+    def add(self, entry: ScanEntry) -> None:
+        self.append(entry.name, entry.size, entry.mtime_ns, entry.inode)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self.names)))]
+        name = self.names[index]
+        return ScanEntry(
+            name,
+            os.path.join(self.directory, name),
+            self.sizes[index],
+            self.mtimes[index],
+            self.inodes[index],
+        )
+
+    def __iter__(self):
+        for index in range(len(self.names)):
+            yield self[index]
+
+
+@dataclass
+class DirListing:
+    path: str
+    depth: int
+    entries: EntryTable
+    ignored: list[str] = field(default_factory=list)
+    subdirs: list[str] = field(default_factory=list)
+    unchanged: EntryTable = field(default_factory=EntryTable)
+
+
+def _noop(*_args, **_kwargs) -> None:
+    return None
+
+
+class TreeWalker:
+    """Generator pipeline over one root folder, one directory listing at a time.
+
+    Directories are read with a single ``os.scandir`` pass each and yielded as
+    soon as they are read, so the mover can start before the walk finishes and
+    memory only ever holds the directory being processed plus the stack of
+    directories still to visit. Symlinked directories are never followed.
+
+    ``max_depth`` counts levels below the root (0 means the root only);
+    ``exclude`` globs are matched against directory names and root-relative
+    paths; ``output_names`` and ``<EXT>_Files`` folders are skipped directly
+    under the root so files that were already sorted are not moved again. ``completed`` maps directories a
+    resumed job already finished to their subdirectory names; those are
+    descended into without being read again.
+    """
+
+    def __init__(
+        self,
+        root: str,
+        *,
+        skip_set: set[str],
+        protected_paths: set[str],
+        recursive: bool = False,
+        max_depth: int | None = None,
+        exclude=(),
+        output_names=frozenset(),
+        snapshots=None,
+        incremental: bool = False,
+        completed: dict[str, list[str]] | None = None,
+        on_log=None,
+    ):
+        self.root = root
+        self.skip_set = skip_set
+        self.protected_paths = protected_paths
+        self.max_depth = (max_depth if max_depth is not None else -1) if recursive else 0
+        self.exclude = [pattern.lower() for pattern in exclude]
+        self.output_names = {name.lower() for name in output_names}
+        self.snapshots = snapshots if incremental else None
+        self.completed = completed or {}
+        self.root_unchanged = False
+        self._on_log = on_log or _noop
+
+    def __iter__(self):
+        stack = [(self.root, 0)]
+        while stack:
+            path, depth = stack.pop()
+            finished = self.completed.get(path)
+            previous = None
+            if self.snapshots is not None and finished is None:
+                previous = self.snapshots.load(path)
+            if finished is not None:
+                subdirs = finished
+            elif previous is not None and _mtime_ns(path) == previous.dir_mtime_ns:
+                if depth == 0:
+                    self.root_unchanged = True
+                    self._on_log(f"{path} unchanged since last run.", "SKIP")
+                subdirs = previous.subdirs
+            else:
+                try:
+                    listing = self.scan(path, depth)
+                except OSError as err:
+                    if depth == 0:
+                        raise
+                    self._on_log(f"Failed to read {path}: {err}", "ERROR")
+                    continue
+                if previous is not None:
+                    self._split_unchanged(listing, previous)
+                subdirs = listing.subdirs
+                yield listing
+            if self.max_depth < 0 or depth < self.max_depth:
+                for name in reversed(subdirs):
+                    if self._should_descend(path, name, depth):
+                        stack.append((os.path.join(path, name), depth + 1))
+
+    def scan(self, path: str, depth: int = 0) -> DirListing:
+        protected_names = _protected_names(path, self.protected_paths)
+        listing = DirListing(path, depth, EntryTable(path))
+        with os.scandir(path) as scanner:
+            for entry in scanner:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        listing.subdirs.append(entry.name)
+                        continue
+                    if not entry.is_file():
+                        continue
+                    # Free on Windows; one lstat (plus one stat for symlinks) elsewhere.
+                    info = entry.stat()
+                except OSError:
+                    continue
+                if entry.name in protected_names:
+                    self._on_log(f"Skipped script file: {entry.name}", "SKIP")
+                    listing.ignored.append(entry.name)
+                    continue
+
+                extension = os.path.splitext(entry.name)[1].lower()
+                if extension in self.skip_set:
+                    self._on_log(f"Skipped {entry.name}: protected extension", "SKIP")
+                    listing.ignored.append(entry.name)
+                    continue
+
+                listing.entries.append(entry.name, info.st_size, info.st_mtime_ns, info.st_ino)
+        return listing
+
+    def _split_unchanged(self, listing: DirListing, previous) -> None:
+        changed, unchanged = EntryTable(listing.path), EntryTable(listing.path)
+        for entry in listing.entries:
+            (unchanged if previous.is_unchanged(entry) else changed).add(entry)
+        if unchanged:
+            listing.entries = changed
+            listing.unchanged = unchanged
+            self._on_log(f"Skipped {len(unchanged)} unchanged files in {listing.path}.", "SKIP")
+
+    def _should_descend(self, parent: str, name: str, depth: int) -> bool:
+        lower_name = name.lower()
+        if depth == 0 and (lower_name in self.output_names or is_dynamic_folder(os.path.join(parent, name))):
+            return False
+        if not self.exclude:
+            return True
+        relative = os.path.relpath(os.path.join(parent, name), self.root).replace(os.sep, "/").lower()
+        return not any(
+            fnmatch.fnmatchcase(lower_name, pattern) or fnmatch.fnmatchcase(relative, pattern)
+            for pattern in self.exclude
+        )
+
+
+def is_dynamic_folder(path: str) -> bool:
+    """Whether ``path`` is a folder the engine made for an unknown extension:
+    named ``<EXT>_Files`` and holding only ``.ext`` files.
+
+    The name alone is not enough (``2024_Files`` or ``Q3_Files`` may be the
+    user's own), so a folder whose name fits is listed as well.
+    """
+    found = DYNAMIC_FOLDER_PATTERN.fullmatch(os.path.basename(path))
+    if found is None:
+        return False
+    extension = "." + found.group(1).lower()
+    try:
+        with os.scandir(path) as scanner:
+            for entry in scanner:
+                if not entry.is_file(follow_symlinks=False):
+                    return False
+                if os.path.splitext(entry.name)[1].lower() != extension:
+                    return False
+    except OSError:
+        return False
+    return True
+
+
+def prefetch(iterable, depth: int = 2):
+    """Iterate ``iterable`` on a background thread, staying up to ``depth`` items ahead.
+
+    Exceptions raised by the iterable are re-raised in the consumer. If the
+    consumer stops early, the producer thread stops at its next item.
+    """
+    items: queue.Queue = queue.Queue(depth)
+    stop = threading.Event()
+
+    def put(item) -> bool:
+        while not stop.is_set():
+            try:
+                items.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce() -> None:
+        try:
+            for value in iterable:
+                if not put((True, value)):
+                    return
+        except BaseException as err:
+            put((False, err))
+        else:
+            put((False, None))
+
+    threading.Thread(target=produce, daemon=True).start()
+    try:
+        while True:
+            ok, value = items.get()
+            if not ok:
+                if value is not None:
+                    raise value
+                return
+            yield value
+    finally:
+        stop.set()
+
+
+def _protected_names(folder_path: str, protected_paths: set[str]) -> set[str]:
+    abs_folder = os.path.abspath(folder_path)
+    return {
+        os.path.basename(path) for path in protected_paths if os.path.dirname(path) == abs_folder
+    }
+
+
+def _mtime_ns(path: str) -> int | None:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
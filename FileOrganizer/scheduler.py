@@ -0,0 +1,217 @@
+import asyncio
+import itertools
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+from jobs import JobCancelled, JobControl
+
+# Lower runs first; jobs of equal priority run in the order they were queued.
+PRIORITY_INTERACTIVE = 0
+PRIORITY_NORMAL = 5
+PRIORITY_BACKGROUND = 10
+
+ACTIVE_STATES = ("queued", "running", "paused", "cancelling")
+
+
+@dataclass(eq=False)
+class Job:
+    job_id: int
+    kind: str  # "organize", "apply", "resume", "undo", "prune" or "watch"
+    name: str
+    priority: int
+    target: object  # called as target(control) on an executor thread
+    control: JobControl = field(default_factory=JobControl)
+    state: str = "queued"
+    result: object = None
+    error: BaseException | None = None
+    done: threading.Event = field(default_factory=threading.Event)
+
+
+@dataclass
+class JobEvent:
+    job_id: int
+    kind: str
+    name: str
+    state: str
+    message: str
+    level: str = "INFO"
+
+
+class JobScheduler:
+    """Queue of organize, undo and prune jobs served by an asyncio loop.
+
+    The loop runs on its own thread and hands each job to a bounded thread
+    pool, so blocking filesystem work never runs on the loop or on the Tk
+    main thread. Jobs start in priority order as pool slots free up; with
+    the default single worker they run one at a time against one engine.
+
+    Every state change is published as a ``JobEvent`` to the callbacks given
+    to ``subscribe``, always from the scheduler thread, in order.
+    """
+
+    def __init__(self, *, workers: int = 1):
+        self.workers = max(1, int(workers))
+        self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix="job")
+        self._jobs: dict[int, Job] = {}
+        self._listeners: list = []
+        self._ids = itertools.count(1)
+        self._order = itertools.count()
+        self._lock = threading.Lock()
+        self._loop = asyncio.new_event_loop()
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=self._serve, name="job-scheduler", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+
+    # region Public API
+    def subscribe(self, callback) -> None:
+        with self._lock:
+            self._listeners.append(callback)
+
+    def submit(self, kind: str, target, *, name: str = "", priority: int = PRIORITY_NORMAL) -> Job:
+        job = Job(next(self._ids), kind, name or kind.title(), priority, target)
+        with self._lock:
+            ahead = sum(
+                1
+                for other in self._jobs.values()
+                if other.state in ACTIVE_STATES and (other.state != "queued" or other.priority <= priority)
+            )
+            self._jobs[job.job_id] = job
+        self._loop.call_soon_threadsafe(self._enqueue, job, ahead)
+        return job
+
+    def jobs(self) -> list[Job]:
+        with self._lock:
+            return list(self._jobs.values())
+
+    def current(self) -> Job | None:
+        """The job that has started and not yet finished, if any."""
+        return next((job for job in self.jobs() if job.state in ("running", "paused", "cancelling")), None)
+
+    @property
+    def busy(self) -> bool:
+        return any(job.state in ACTIVE_STATES for job in self.jobs())
+
+    def cancel(self, job_id: int | None = None) -> None:
+        """Cancel one job, or every queued and running job."""
+        for job in self._select(job_id):
+            job.control.cancel()
+            self._loop.call_soon_threadsafe(self._cancelled, job)
+
+    def pause(self, job_id: int | None = None) -> None:
+        for job in self._select(job_id):
+            if job.state == "running":
+                job.control.pause()
+                self._loop.call_soon_threadsafe(self._set_state, job, "paused", "Paused")
+
+    def resume(self, job_id: int | None = None) -> None:
+        for job in self._select(job_id):
+            if job.state == "paused":
+                job.control.resume()
+                self._loop.call_soon_threadsafe(self._resumed, job)
+
+    def wait(self, job: Job, timeout: float | None = None) -> bool:
+        # Short waits keep Ctrl+C responsive on every platform.
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not job.done.wait(0.25):
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+        return True
+
+    def shutdown(self, *, cancel: bool = False) -> None:
+        """Stop taking jobs; queued ones still run unless ``cancel`` is set."""
+        if cancel:
+            self.cancel()
+        if self._thread.is_alive():
+            self._loop.call_soon_threadsafe(self._queue.put_nowait, (math.inf, next(self._order), None))
+            self._thread.join()
+        self._executor.shutdown(wait=True)
+
+    # endregion
+
+    # region Loop
+    def _serve(self) -> None:
+        asyncio.set_event_loop(self._loop)
+        self._queue: asyncio.PriorityQueue = asyncio.PriorityQueue()
+        self._slots = asyncio.Semaphore(self.workers)
+        self._tasks: set[asyncio.Task] = set()
+        self._ready.set()
+        try:
+            self._loop.run_until_complete(self._dispatch())
+        finally:
+            self._loop.close()
+
+    async def _dispatch(self) -> None:
+        while True:
+            # Take a slot first, so a job queued while all slots are busy can
+            # still overtake lower-priority jobs that are waiting.
+            await self._slots.acquire()
+            _, _, job = await self._queue.get()
+            if job is None:
+                self._slots.release()
+                break
+            if job.state != "queued":  # cancelled while waiting
+                self._slots.release()
+                continue
+            task = asyncio.ensure_future(self._execute(job))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        if self._tasks:
+            await asyncio.gather(*self._tasks)
+
+    async def _execute(self, job: Job) -> None:
+        try:
+            self._set_state(job, "running", "Started")
+            try:
+                job.result = await self._loop.run_in_executor(self._executor, job.target, job.control)
+            except JobCancelled:
+                self._set_state(job, "cancelled", "Cancelled")
+            except Exception as err:
+                job.error = err
+                self._set_state(job, "failed", f"Failed: {err}", level="ERROR")
+            else:
+                self._set_state(job, "done", "Finished")
+        finally:
+            job.done.set()
+            self._slots.release()
+
+    def _enqueue(self, job: Job, ahead: int) -> None:
+        if job.state != "queued":
+            return
+        self._queue.put_nowait((job.priority, next(self._order), job))
+        self._emit(job, f"Queued, {ahead} ahead" if ahead else "Queued")
+
+    def _cancelled(self, job: Job) -> None:
+        if job.state == "queued":
+            self._set_state(job, "cancelled", "Cancelled before it started")
+            job.done.set()
+        elif job.state in ("running", "paused"):
+            self._set_state(job, "cancelling", "Cancelling after the current file")
+
+    def _resumed(self, job: Job) -> None:
+        if job.state == "paused":
+            self._set_state(job, "running", "Resumed")
+
+    def _set_state(self, job: Job, state: str, message: str, *, level: str = "INFO") -> None:
+        job.state = state
+        self._emit(job, message, level=level)
+
+    def _emit(self, job: Job, message: str, *, level: str = "INFO") -> None:
+        event = JobEvent(job.job_id, job.kind, job.name, job.state, message, level)
+        with self._lock:
+            listeners = list(self._listeners)
+            if job.state not in ACTIVE_STATES:
+                self._jobs.pop(job.job_id, None)
+        for callback in listeners:
+            try:
+                callback(event)
+            except Exception:  # a broken listener must not stall the queue
+                pass
+
+    def _select(self, job_id: int | None) -> list[Job]:
+        return [job for job in self.jobs() if job_id is None or job.job_id == job_id]
+
+    # endregion
@@ -0,0 +1,186 @@
+import json
+import os
+import threading
+
+SETTINGS_VERSION = 2
+DEFAULT_SETTINGS = {
+    "custom_rules": {},
+    "rules": [],
+    "dry_run": False,
+    "delete_empty": False,
+    "incremental": False,
+    "recursive": False,
+    "max_depth": None,
+    "exclude": [],
+    "duplicates": "keep",
+    "sniff_content": False,
+    "metrics_file": None,
+    "move_workers": 1,
+    "roots": [],
+    "root_workers": 4,
+    "per_device": 1,
+}
+
+
+def _normalize_extension(ext: str) -> str:
+    ext = ext.strip().lower()
+    return ext if ext.startswith(".") else "." + ext
+
+
+def _migrate_v1(data: dict) -> dict:
+    """Unversioned files: custom rule keys could lack the dot or be upper case."""
+    custom_rules = data.get("custom_rules")
+    if isinstance(custom_rules, dict):
+        data["custom_rules"] = {
+            _normalize_extension(str(ext)): folder
+            for ext, folder in custom_rules.items()
+            if isinstance(folder, str) and str(ext).strip(" .")
+        }
+    return data
+
+
+# MIGRATIONS[n] upgrades a version-n file to version n + 1.
+MIGRATIONS = {1: _migrate_v1}
+
+
+def migrate(data: dict) -> dict:
+    version = data.get("version", 1)
+    if not isinstance(version, int) or version > SETTINGS_VERSION:
+        raise ValueError(f"unsupported settings version {version!r}")
+    while version < SETTINGS_VERSION:
+        data = MIGRATIONS[version](dict(data))
+        version += 1
+    data["version"] = SETTINGS_VERSION
+    return data
+
+
+def write_json_atomic(path: str, data) -> None:
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    temp_path = path + ".tmp"
+    with open(temp_path, "w", encoding="utf-8", newline="\n") as f:
+        json.dump(data, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+
+
+def read_rule_set(path: str) -> tuple[dict[str, str], list[dict]]:
+    """Rules from a settings file, an exported rule set, a list of advanced
+    rules, or a plain ``{".ext": "Folder"}`` mapping."""
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if isinstance(data, list):
+        return {}, data
+    if not isinstance(data, dict):
+        raise ValueError(f"{path}: expected a JSON object or list")
+    if "custom_rules" in data or "rules" in data:
+        data = migrate(data)
+        custom_rules = data.get("custom_rules", {})
+        rules = data.get("rules", [])
+    else:
+        custom_rules, rules = _migrate_v1({"custom_rules": data})["custom_rules"], []
+    if not isinstance(rules, list):
+        raise ValueError(f"{path}: 'rules' must be a list")
+    if not isinstance(custom_rules, dict):
+        raise ValueError(f"{path}: 'custom_rules' must be an object")
+    return (
+        {str(ext): str(folder) for ext, folder in custom_rules.items() if isinstance(folder, str)},
+        rules,
+    )
+
+
+def export_rule_set(path: str, custom_rules: dict[str, str], rules: list[dict]) -> None:
+    write_json_atomic(
+        path, {"version": SETTINGS_VERSION, "custom_rules": dict(custom_rules), "rules": list(rules)}
+    )
+
+
+class SettingsStore:
+    """``settings.json`` kept in memory, saved atomically and reloaded when it
+    changes on disk.
+
+    ``update`` marks the settings dirty and saves ``save_delay`` seconds
+    later, so a burst of toggles is one write; ``flush`` saves at once.
+    ``reload_if_changed`` is a single ``stat``: it reloads only when the
+    file's mtime or size differ from what this store last read or wrote,
+    so long-running processes can call it on every tick.
+    """
+
+    def __init__(self, path: str, *, save_delay: float = 1.0, on_error=None):
+        self.path = path
+        self.save_delay = save_delay
+        self._on_error = on_error or (lambda err: None)
+        self._data = dict(DEFAULT_SETTINGS)
+        self._stamp: tuple[int, int] | None = None
+        self._timer: threading.Timer | None = None
+        self._dirty = False
+        self._lock = threading.RLock()
+        self.load()
+
+    @property
+    def data(self) -> dict:
+        with self._lock:
+            return dict(self._data)
+
+    def get(self, key: str, default=None):
+        with self._lock:
+            return self._data.get(key, default)
+
+    def load(self) -> dict:
+        with self._lock:
+            stamp = self._file_stamp()
+            data = dict(DEFAULT_SETTINGS)
+            if stamp is not None:
+                try:
+                    with open(self.path, "r", encoding="utf-8") as f:
+                        loaded = json.load(f)
+                    if not isinstance(loaded, dict):
+                        raise ValueError("expected a JSON object")
+                    data.update(migrate(loaded))
+                except (OSError, ValueError) as err:
+                    self._on_error(err)
+            data.pop("version", None)
+            self._data, self._stamp = data, stamp
+            return dict(data)
+
+    def reload_if_changed(self) -> bool:
+        with self._lock:
+            if self._dirty:  # our own unsaved changes win
+                return False
+            if self._file_stamp() == self._stamp:
+                return False
+            self.load()
+            return True
+
+    def update(self, changes: dict | None = None, **kwargs) -> None:
+        with self._lock:
+            self._data.update(changes or {}, **kwargs)
+            self._dirty = True
+            if self.save_delay <= 0:
+                self.flush()
+            elif self._timer is None:
+                self._timer = threading.Timer(self.save_delay, self.flush)
+                self._timer.start()
+
+    def flush(self) -> None:
+        """Write pending changes now."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._dirty:
+                return
+            self._dirty = False
+            try:
+                write_json_atomic(self.path, {"version": SETTINGS_VERSION, **self._data})
+                self._stamp = self._file_stamp()
+            except OSError as err:
+                self._on_error(err)
+
+    def _file_stamp(self) -> tuple[int, int] | None:
+        try:
+            info = os.stat(self.path)
+        except OSError:
+            return None
+        return info.st_mtime_ns, info.st_size
@@ -0,0 +1,70 @@
+import hashlib
+import json
+import os
+from dataclasses import dataclass, field
+
+
+@dataclass
+class FolderSnapshot:
+    folder: str
+    dir_mtime_ns: int
+    entries: dict[str, tuple[int, int, int]] = field(default_factory=dict)
+    subdirs: list[str] = field(default_factory=list)
+
+    def is_unchanged(self, entry) -> bool:
+        return self.entries.get(entry.name) == (entry.size, entry.mtime_ns, entry.inode)
+
+
+class SnapshotIndex:
+    """Per-folder record of what a folder looked like after the last incremental run.
+
+    Each folder gets one small JSON file keyed by a hash of its absolute path,
+    holding the folder mtime plus ``name -> (size, mtime_ns, inode)`` for the
+    files that were left in place, and the names of its subfolders so a
+    recursive run can descend without listing an unchanged folder again.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def load(self, folder_path: str) -> FolderSnapshot | None:
+        try:
+            with open(self._path(folder_path), "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return FolderSnapshot(
+                data["folder"],
+                int(data["dir_mtime_ns"]),
+                {name: tuple(values) for name, values in data["entries"].items()},
+                list(data.get("subdirs", [])),
+            )
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def save(self, folder_path: str, entries, ignored_names=(), subdirs=()) -> None:
+        try:
+            dir_mtime_ns = os.stat(folder_path).st_mtime_ns
+            with os.scandir(folder_path) as scanner:
+                present = {entry.name for entry in scanner if entry.is_file()}
+        except OSError:
+            return
+        # A file that appeared after the scan would be hidden behind the new
+        # folder mtime; leave the mtime unset so the next run rescans.
+        if present - {entry.name for entry in entries} - set(ignored_names):
+            dir_mtime_ns = 0
+        data = {
+            "folder": os.path.abspath(folder_path),
+            "dir_mtime_ns": dir_mtime_ns,
+            "entries": {entry.name: [entry.size, entry.mtime_ns, entry.inode] for entry in entries},
+            "subdirs": list(subdirs),
+        }
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(folder_path)
+        temp_path = path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(temp_path, path)
+
+    def _path(self, folder_path: str) -> str:
+        key = os.path.normcase(os.path.abspath(folder_path))
+        digest = hashlib.sha1(key.encode("utf-8", "surrogatepass")).hexdigest()
+        return os.path.join(self.directory, digest + ".json")
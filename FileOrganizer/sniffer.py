@@ -0,0 +1,105 @@
+import os
+import re
+
+HEADER_BYTES = 512  # covers the tar magic at offset 257
+
+# (pattern matched at the start of the header, category, confident); earlier
+# entries win, so specific signatures must come before the generic ones they
+# overlap with. Only confident signatures may overrule a file's extension:
+# containers (ZIP, OLE, ISO-BMFF), text formats and short magics are shared
+# by too many formats to say a ``.msi`` or ``.svg`` file is mislabeled.
+SIGNATURES = [
+    (rb"%PDF-", "Documents", True),
+    (rb"\{\\rtf", "Documents", True),
+    (rb"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1", "Documents", False),  # legacy Office, also .msi
+    (rb"PK\x03\x04.{26}(?:\[Content_Types\]\.xml|_rels/|docProps/|word/|xl/|ppt/)", "Documents", False),
+    (rb"PK\x03\x04.{26}mimetypeapplication/vnd\.oasis", "Documents", False),
+    (rb"PK\x03\x04.{26}(?:META-INF/|AndroidManifest\.xml|classes\.dex)", "System_Apps", False),
+    (rb"PK\x03\x04", "Archives", False),
+    (rb"\x89PNG\r\n\x1a\n", "Images", True),
+    (rb"\xff\xd8\xff", "Images", True),
+    (rb"GIF8[79]a", "Images", True),
+    (rb"RIFF....WEBP", "Images", True),
+    (rb"8BPS", "Images", True),
+    (rb"....ftyp(?:heic|heix|mif1|avif)", "Images", True),
+    (rb"RIFF....WAVE", "Audio", True),
+    (rb"ID3", "Audio", True),
+    (rb"\xff[\xfb\xf3\xf2]", "Audio", False),
+    (rb"fLaC", "Audio", True),
+    (rb"OggS", "Audio", False),  # also Ogg video
+    (rb"MThd", "Audio", True),
+    (rb"....ftypM4A", "Audio", True),
+    (rb"....ftyp", "Videos", False),
+    (rb"RIFF....AVI ", "Videos", True),
+    (rb"\x1a\x45\xdf\xa3", "Videos", True),
+    (rb"FLV\x01", "Videos", True),
+    (rb"\x30\x26\xb2\x75\x8e\x66\xcf\x11", "Videos", False),  # ASF, also .wma
+    (rb"Rar!\x1a\x07", "Archives", True),
+    (rb"7z\xbc\xaf\x27\x1c", "Archives", True),
+    (rb"\x1f\x8b", "Archives", True),
+    (rb"BZh[1-9]", "Archives", True),
+    (rb"\xfd7zXZ\x00", "Archives", True),
+    (rb".{257}ustar", "Archives", True),
+    (rb"\x7fELF", "System_Apps", True),
+    (rb"MZ", "System_Apps", False),
+    (rb"\xcf\xfa\xed\xfe|\xce\xfa\xed\xfe", "System_Apps", True),
+    (rb"\s*(?i:<!DOCTYPE html|<html)", "Developer_Files", False),
+    (rb"\s*<\?xml", "Developer_Files", False),
+    (rb"#!", "Developer_Files", False),
+]
+
+_SIGNATURE_RE = re.compile(
+    b"|".join(b"(%s)" % pattern for pattern, _, _ in SIGNATURES), re.DOTALL
+)
+_GROUP_CATEGORIES = [category for _, category, _ in SIGNATURES]
+_GROUP_CONFIDENT = [confident for _, _, confident in SIGNATURES]
+
+
+def sniff_category(header: bytes) -> str | None:
+    signature = sniff_signature(header)
+    return signature[0] if signature else None
+
+
+def sniff_signature(header: bytes) -> tuple[str, bool] | None:
+    """``(category, confident)`` for ``header``, or ``None`` if nothing matches."""
+    found = _SIGNATURE_RE.match(header)
+    if found is None:
+        return None
+    return _GROUP_CATEGORIES[found.lastindex - 1], _GROUP_CONFIDENT[found.lastindex - 1]
+
+
+class ContentSniffer:
+    """Picks a ``MASTER_CATEGORIES`` bucket from a file's first ``HEADER_BYTES``.
+
+    Each file costs one stat and, on a cache miss, one unbuffered read of the
+    header; the result (or the lack of one) is cached by inode, size and mtime.
+    With ``confident_only`` only a signature that may overrule the file's
+    extension counts.
+    """
+
+    SNIFFED = 4
+    CONFIDENT = 5
+
+    def __init__(self, cache):
+        self.cache = cache
+
+    def category(self, path: str, *, confident_only: bool = False) -> str | None:
+        try:
+            info = os.stat(path)
+        except OSError:
+            return None
+        cached = self.cache.get(info, self.SNIFFED)
+        confident = self.cache.get(info, self.CONFIDENT)
+        if cached is None or confident is None:  # entries from before CONFIDENT lack it
+            try:
+                with open(path, "rb", buffering=0) as f:
+                    header = f.read(HEADER_BYTES)
+            except OSError:
+                return None
+            cached, confident = sniff_signature(header) or ("", False)
+            confident = "1" if confident else ""
+            self.cache.put(info, self.SNIFFED, cached)
+            self.cache.put(info, self.CONFIDENT, confident)
+        if confident_only and not confident:
+            return None
+        return cached or None
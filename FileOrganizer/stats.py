@@ -0,0 +1,249 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+# What the index can raise; callers treat statistics as best effort.
+STATS_ERRORS = (OSError, sqlite3.Error)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    kind TEXT NOT NULL,
+    started TEXT NOT NULL,
+    finished TEXT,
+    status TEXT,
+    seconds REAL,
+    roots TEXT NOT NULL,
+    files_scanned INTEGER NOT NULL DEFAULT 0,
+    files_moved INTEGER NOT NULL DEFAULT 0,
+    bytes_moved INTEGER NOT NULL DEFAULT 0,
+    files_skipped INTEGER NOT NULL DEFAULT 0,
+    files_failed INTEGER NOT NULL DEFAULT 0,
+    duplicates INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS runs_started ON runs (started);
+CREATE TABLE IF NOT EXISTS run_categories (
+    run_id INTEGER NOT NULL REFERENCES runs (id) ON DELETE CASCADE,
+    category TEXT NOT NULL,
+    files INTEGER NOT NULL,
+    bytes INTEGER NOT NULL,
+    PRIMARY KEY (run_id, category)
+);
+CREATE INDEX IF NOT EXISTS run_categories_category ON run_categories (category, run_id);
+CREATE TABLE IF NOT EXISTS run_failures (
+    run_id INTEGER NOT NULL REFERENCES runs (id) ON DELETE CASCADE,
+    path TEXT NOT NULL,
+    error TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS run_failures_run ON run_failures (run_id);
+CREATE TABLE IF NOT EXISTS run_dynamic_folders (
+    run_id INTEGER NOT NULL REFERENCES runs (id) ON DELETE CASCADE,
+    extension TEXT NOT NULL,
+    folder TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS run_dynamic_folders_extension ON run_dynamic_folders (extension, run_id);
+"""
+
+
+def _now() -> str:
+    return time.strftime("%Y-%m-%dT%H:%M:%S")
+
+
+def since_days(days: float) -> str:
+    """The ``since`` timestamp for "the last ``days`` days"."""
+    return time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(time.time() - days * 86400))
+
+
+class RunRecorder:
+    """Rows of one run waiting to be written to a ``StatsIndex``.
+
+    Failures and created folders are buffered and written ``batch_size`` rows
+    per transaction, so the movers never wait on a commit per file. The run
+    summary and per-category totals are written once, by ``finish``.
+    """
+
+    def __init__(self, index: "StatsIndex", run_id: int, *, batch_size: int = 256):
+        self.index = index
+        self.run_id = run_id
+        self._batch_size = batch_size
+        self._failures: list[tuple[int, str, str]] = []
+        self._folders: list[tuple[int, str, str]] = []
+        self._lock = threading.Lock()
+
+    def failure(self, path: str, error: str) -> None:
+        with self._lock:
+            self._failures.append((self.run_id, path, error))
+            if len(self._failures) >= self._batch_size:
+                self._flush()
+
+    def dynamic_folder(self, folder: str, extension: str) -> None:
+        with self._lock:
+            self._folders.append((self.run_id, extension, folder))
+            if len(self._folders) >= self._batch_size:
+                self._flush()
+
+    def finish(self, metrics, status: str = "done") -> None:
+        """Write the run's totals; ``status`` is "done" or "cancelled"."""
+        data = metrics.to_dict()
+        counters = data["counters"]
+        with self._lock:
+            self._flush()
+            with self.index.transaction() as db:
+                db.execute(
+                    "UPDATE runs SET finished = ?, status = ?, seconds = ?, files_scanned = ?,"
+                    " files_moved = ?, bytes_moved = ?, files_skipped = ?, files_failed = ?,"
+                    " duplicates = ? WHERE id = ?",
+                    (
+                        data["finished"] or _now(),
+                        status,
+                        data["seconds"],
+                        counters.get("files_scanned", 0),
+                        counters.get("files_moved", 0),
+                        counters.get("bytes_moved", 0),
+                        counters.get("files_skipped", 0),
+                        counters.get("files_failed", 0),
+                        counters.get("duplicates", 0),
+                        self.run_id,
+                    ),
+                )
+                db.executemany(
+                    "INSERT OR REPLACE INTO run_categories VALUES (?, ?, ?, ?)",
+                    [
+                        (self.run_id, category, files, size)
+                        for category, (files, size) in data["categories"].items()
+                    ],
+                )
+
+    def _flush(self) -> None:
+        if not self._failures and not self._folders:
+            return
+        with self.index.transaction() as db:
+            db.executemany("INSERT INTO run_failures VALUES (?, ?, ?)", self._failures)
+            db.executemany("INSERT INTO run_dynamic_folders VALUES (?, ?, ?)", self._folders)
+        self._failures.clear()
+        self._folders.clear()
+
+
+class StatsIndex:
+    """SQLite index of past runs: a summary per run, bytes and files moved per
+    category, the files that failed and the ``<EXT>_Files`` folders created.
+
+    Timestamps are local ISO strings, so ``since``/``until`` compare as text
+    and use the ``started`` index.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._db: sqlite3.Connection | None = None
+        self._lock = threading.RLock()
+
+    def begin(self, kind: str, roots) -> RunRecorder:
+        with self.transaction() as db:
+            cursor = db.execute(
+                "INSERT INTO runs (kind, started, roots) VALUES (?, ?, ?)",
+                (kind, _now(), json.dumps(list(roots))),
+            )
+        return RunRecorder(self, cursor.lastrowid)
+
+    def runs(
+        self, *, since: str | None = None, until: str | None = None, limit: int | None = 20
+    ) -> list[dict]:
+        """Most recent runs first."""
+        where, params = self._between(since, until)
+        rows = self._query(
+            f"SELECT * FROM runs {where} ORDER BY started DESC, id DESC LIMIT ?",
+            (*params, -1 if limit is None else limit),
+        )
+        for row in rows:
+            row["roots"] = json.loads(row["roots"])
+        return rows
+
+    def category_totals(
+        self, *, since: str | None = None, until: str | None = None, category: str | None = None
+    ) -> list[dict]:
+        """Files and bytes moved per category, largest first."""
+        where, params = self._between(since, until, "r.")
+        if category is not None:
+            where += (" AND " if where else "WHERE ") + "c.category = ?"
+            params.append(category)
+        return self._query(
+            "SELECT c.category, SUM(c.files) AS files, SUM(c.bytes) AS bytes, COUNT(*) AS runs"
+            f" FROM run_categories c JOIN runs r ON r.id = c.run_id {where}"
+            " GROUP BY c.category ORDER BY bytes DESC",
+            params,
+        )
+
+    def dynamic_folders(self, *, since: str | None = None, until: str | None = None) -> list[dict]:
+        """Extensions that keep getting a folder of their own, most frequent first."""
+        where, params = self._between(since, until, "r.")
+        return self._query(
+            "SELECT d.extension, COUNT(*) AS folders, COUNT(DISTINCT d.run_id) AS runs,"
+            " MAX(r.started) AS last_seen"
+            f" FROM run_dynamic_folders d JOIN runs r ON r.id = d.run_id {where}"
+            " GROUP BY d.extension ORDER BY folders DESC, d.extension",
+            params,
+        )
+
+    def failures(
+        self, *, run_id: int | None = None, since: str | None = None, limit: int | None = 50
+    ) -> list[dict]:
+        where, params = self._between(since, None, "r.")
+        if run_id is not None:
+            where += (" AND " if where else "WHERE ") + "f.run_id = ?"
+            params.append(run_id)
+        return self._query(
+            "SELECT f.run_id, r.started, f.path, f.error"
+            f" FROM run_failures f JOIN runs r ON r.id = f.run_id {where}"
+            " ORDER BY f.run_id DESC, f.rowid LIMIT ?",
+            (*params, -1 if limit is None else limit),
+        )
+
+    @contextmanager
+    def transaction(self):
+        """``with index.transaction() as db:`` commits on success, rolls back on error."""
+        with self._lock:
+            db = self._connection()
+            try:
+                yield db
+            except BaseException:
+                db.rollback()
+                raise
+            db.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._db is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            db = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+            db.row_factory = sqlite3.Row
+            db.execute("PRAGMA journal_mode = WAL")
+            db.execute("PRAGMA synchronous = NORMAL")
+            db.execute("PRAGMA foreign_keys = ON")
+            db.executescript(SCHEMA)
+            if "status" not in {row[1] for row in db.execute("PRAGMA table_info(runs)")}:
+                db.execute("ALTER TABLE runs ADD COLUMN status TEXT")  # indexes made before it existed
+            self._db = db
+        return self._db
+
+    def _query(self, sql: str, params) -> list[dict]:
+        with self._lock:
+            return [dict(row) for row in self._connection().execute(sql, tuple(params))]
+
+    @staticmethod
+    def _between(since: str | None, until: str | None, prefix: str = "") -> tuple[str, list]:
+        clauses, params = [], []
+        if since is not None:
+            clauses.append(f"{prefix}started >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append(f"{prefix}started < ?")
+            params.append(until)
+        return ("WHERE " + " AND ".join(clauses) if clauses else ""), params
@@ -0,0 +1,77 @@
+import threading
+from collections import deque
+from dataclasses import dataclass, field
+
+
+@dataclass
+class UiBatch:
+    lines: list[str] = field(default_factory=list)
+    dropped: int = 0
+    progress: float | None = None
+    status: str | None = None
+    detail: str | None = None
+    phase: str | None = None
+    calls: list = field(default_factory=list)
+
+
+class UiEventChannel:
+    """Thread-safe mailbox between worker threads and the Tk main loop.
+
+    Workers post as often as they like; the UI drains one coalesced batch per
+    tick, so the number of Tk calls no longer depends on how many files a job
+    touches. Only the latest progress, status and phase values are kept, and
+    log lines beyond ``max_lines`` are counted instead of stored.
+    """
+
+    def __init__(self, max_lines: int = 5000):
+        self._lock = threading.Lock()
+        self._lines: deque[str] = deque(maxlen=max_lines)
+        self._dropped = 0
+        self._progress: float | None = None
+        self._status: str | None = None
+        self._detail: str | None = None
+        self._phase: str | None = None
+        self._calls: list = []
+
+    def log(self, line: str) -> None:
+        with self._lock:
+            if len(self._lines) == self._lines.maxlen:
+                self._dropped += 1
+            self._lines.append(line)
+
+    def progress(self, value: float) -> None:
+        with self._lock:
+            self._progress = value
+
+    def status(self, text: str) -> None:
+        with self._lock:
+            self._status = text
+
+    def detail(self, text: str) -> None:
+        with self._lock:
+            self._detail = text
+
+    def phase(self, phase: str) -> None:
+        with self._lock:
+            self._phase = phase
+
+    def call(self, func) -> None:
+        with self._lock:
+            self._calls.append(func)
+
+    def drain(self) -> UiBatch:
+        with self._lock:
+            batch = UiBatch(
+                lines=list(self._lines),
+                dropped=self._dropped,
+                progress=self._progress,
+                status=self._status,
+                detail=self._detail,
+                phase=self._phase,
+                calls=self._calls,
+            )
+            self._lines.clear()
+            self._dropped = 0
+            self._progress = self._status = self._detail = self._phase = None
+            self._calls = []
+        return batch
@@ -0,0 +1,268 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from dataclasses import dataclass
+
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_Q_OVERFLOW = 0x00004000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+@dataclass
+class _Pending:
+    size: int = -1
+    mtime_ns: int = -1
+    last_change: float = 0.0
+    awaiting_close: bool = False
+
+
+class _InotifyBackend:
+    """Linux inotify through libc; yields ``(folder, name, still_open)`` events."""
+
+    MASK = IN_CREATE | IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO
+
+    def __init__(self, folders: list[str]):
+        libc_name = ctypes.util.find_library("c") or "libc.so.6"
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        self._fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._folders: dict[int, str] = {}
+        for folder in folders:
+            wd = self._libc.inotify_add_watch(self._fd, os.fsencode(folder), self.MASK)
+            if wd < 0:
+                os.close(self._fd)
+                raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {folder}")
+            self._folders[wd] = folder
+        self.overflowed = False
+
+    def poll(self, timeout: float):
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            wd, mask, _cookie, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            raw_name = data[offset:offset + length].rstrip(b"\0")
+            offset += length
+            if mask & IN_Q_OVERFLOW:
+                self.overflowed = True
+                continue
+            folder = self._folders.get(wd)
+            if folder is None or mask & IN_ISDIR or not raw_name:
+                continue
+            closed = bool(mask & (IN_CLOSE_WRITE | IN_MOVED_TO))
+            yield folder, os.fsdecode(raw_name), not closed
+
+    def close(self) -> None:
+        os.close(self._fd)
+
+
+class _PollingBackend:
+    """Portable fallback: only folders whose mtime moved are listed again."""
+
+    def __init__(self, folders: list[str], interval: float):
+        self._interval = interval
+        self._next_check = time.monotonic() + interval
+        self._mtimes: dict[str, int | None] = {folder: _mtime_ns(folder) for folder in folders}
+        self.overflowed = False
+
+    def poll(self, timeout: float):
+        time.sleep(timeout)
+        if time.monotonic() < self._next_check:
+            return
+        self._next_check = time.monotonic() + self._interval
+        for folder, previous in self._mtimes.items():
+            current = _mtime_ns(folder)
+            if current == previous:
+                continue
+            self._mtimes[folder] = current
+            for name in _list_files(folder):
+                yield folder, name, False
+
+    def close(self) -> None:
+        return None
+
+
+class FolderWatcher:
+    """Long-running watcher that feeds new files to ``OrganizerEngine.organize_files``.
+
+    A file is handed over once it has been quiet for ``debounce`` seconds: on
+    inotify after its close-write (or rename into the folder), otherwise once
+    its size and mtime stop changing. Files still open for writing are given
+    up to ``open_timeout`` seconds. Ready files go out in batches of
+    ``batch_size`` per folder. All moves of one watch go into one undo session.
+
+    Each batch is handed to ``run_batch`` as a no-argument callable; it must
+    return the callable's result, or ``None`` if the batch never ran, in which
+    case its files are tried again. The GUI queues batches on its job
+    scheduler this way, so they never use the engine alongside another job.
+    """
+
+    def __init__(
+        self,
+        engine,
+        job_definitions,
+        *,
+        dry_run: bool = False,
+        debounce: float = 2.0,
+        poll_interval: float = 5.0,
+        open_timeout: float = 60.0,
+        batch_size: int = 50,
+        on_log=None,
+        run_batch=None,
+    ):
+        self.engine = engine
+        self.folders = {
+            folder_path: {ext.lower() for ext in (skip_exts or set())}
+            for _label, folder_path, skip_exts in job_definitions
+            if os.path.isdir(folder_path)
+        }
+        self.dry_run = dry_run
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self.open_timeout = open_timeout
+        self.batch_size = batch_size
+        self._on_log = on_log or (lambda message, level: None)
+        self._run_batch = run_batch or (lambda organize: organize())
+        self._stop = threading.Event()
+        self._pending: dict[tuple[str, str], _Pending] = {}
+        self._settled: dict[tuple[str, str], tuple[int, int]] = {}
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def run(self) -> int:
+        if not self.folders:
+            self._on_log("No folders to watch.", "SKIP")
+            return 0
+        backend = self._open_backend()
+        writer = None
+        if self.engine.journal is not None and not self.dry_run:
+            try:
+                writer = self.engine.journal.begin(list(self.folders))
+            except OSError as err:
+                self._on_log(f"Undo journal unavailable, keeping undo in memory: {err}", "ERROR")
+        moved = 0
+        try:
+            for folder in self.folders:
+                self._queue_folder(folder)
+            while not self._stop.is_set():
+                for folder, name, still_open in backend.poll(min(self.debounce, 1.0)):
+                    self._touch(folder, name, still_open)
+                if backend.overflowed:
+                    backend.overflowed = False
+                    for folder in self.folders:
+                        self._queue_folder(folder)
+                moved += self._flush_ready(writer)
+        finally:
+            backend.close()
+            if writer is not None:
+                writer.close()
+        self._on_log(f"Watch stopped. {moved} files moved.", "INFO")
+        return moved
+
+    def _open_backend(self):
+        if sys.platform.startswith("linux"):
+            try:
+                backend = _InotifyBackend(list(self.folders))
+                self._on_log(f"Watching {len(self.folders)} folders (inotify).", "INFO")
+                return backend
+            except (OSError, AttributeError) as err:
+                self._on_log(f"inotify unavailable, polling instead: {err}", "INFO")
+        self._on_log(f"Watching {len(self.folders)} folders (polling).", "INFO")
+        return _PollingBackend(list(self.folders), self.poll_interval)
+
+    def _queue_folder(self, folder: str) -> None:
+        for name in _list_files(folder):
+            self._touch(folder, name, False)
+
+    def _touch(self, folder: str, name: str, still_open: bool) -> None:
+        key = (folder, name)
+        pending = self._pending.get(key)
+        if pending is None:
+            pending = self._pending[key] = _Pending()
+        pending.last_change = time.monotonic()
+        pending.awaiting_close = still_open
+
+    def _flush_ready(self, writer) -> int:
+        now = time.monotonic()
+        ready: dict[str, list[str]] = {}
+        for key, pending in list(self._pending.items()):
+            try:
+                info = os.stat(os.path.join(*key))
+            except OSError:
+                del self._pending[key]
+                continue
+            if (info.st_size, info.st_mtime_ns) != (pending.size, pending.mtime_ns):
+                pending.size, pending.mtime_ns = info.st_size, info.st_mtime_ns
+                pending.last_change = now
+                continue
+            quiet = now - pending.last_change
+            if quiet < self.debounce or (pending.awaiting_close and quiet < self.open_timeout):
+                continue
+            del self._pending[key]
+            if self._settled.get(key) == (info.st_size, info.st_mtime_ns):
+                continue
+            self._settled[key] = (info.st_size, info.st_mtime_ns)
+            ready.setdefault(key[0], []).append(key[1])
+
+        moved = 0
+        for folder, names in ready.items():
+            for start in range(0, len(names), self.batch_size):
+                if self._stop.is_set():
+                    break  # the rest are picked up by the next watch
+                batch = names[start:start + self.batch_size]
+                batch_moved = self._run_batch(
+                    lambda folder=folder, batch=batch: self.engine.organize_files(
+                        folder,
+                        batch,
+                        skip_exts=self.folders[folder],
+                        dry_run=self.dry_run,
+                        writer=writer,
+                    )
+                )
+                if batch_moved is None:  # e.g. its job was cancelled before it started
+                    for name in batch:
+                        self._settled.pop((folder, name), None)
+                        self._touch(folder, name, False)
+                    continue
+                moved += batch_moved
+                # Remember only what stayed behind so it is not retried until it changes.
+                for name in batch:
+                    if not os.path.lexists(os.path.join(folder, name)):
+                        self._settled.pop((folder, name), None)
+        if ready and writer is not None:
+            writer.flush()
+        return moved
+
+
+def _mtime_ns(folder: str) -> int | None:
+    try:
+        return os.stat(folder).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _list_files(folder: str) -> list[str]:
+    try:
+        with os.scandir(folder) as scanner:
+            return [entry.name for entry in scanner if entry.is_file()]
+    except OSError:
+        return []
@@ -0,0 +1,70 @@
+import os
+
+import pytest
+
+from checkpoint import CheckpointStore
+from engine import OrganizerEngine
+from jobs import JobCancelled, JobControl
+
+
+def _touch(path: str, data: bytes = b"x") -> str:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(data)
+    return path
+
+
+def _cancel_after(control: JobControl, moves: int):
+    """An ``on_log`` callback that cancels the job once ``moves`` files have moved."""
+    moved = []
+
+    def on_log(message, level):
+        if message.startswith("Moved "):
+            moved.append(message)
+            if len(moved) == moves:
+                control.cancel()
+
+    return on_log
+
+
+@pytest.fixture
+def inbox(tmp_path):
+    folder = tmp_path / "inbox"
+    for sub in ("one", "two", "three"):
+        for number in range(5):
+            _touch(str(folder / sub / f"{sub}{number}.txt"))
+    return folder
+
+
+def _organized(folder) -> list[str]:
+    return sorted(
+        os.path.join(os.path.relpath(parent, folder), name)
+        for parent, _dirs, names in os.walk(folder)
+        for name in names
+        if os.path.basename(parent) == "Documents"
+    )
+
+
+def test_resume_finishes_an_interrupted_run(tmp_path, inbox):
+    store = CheckpointStore(str(tmp_path / "checkpoints"))
+    control = JobControl()
+    engine = OrganizerEngine(checkpoints=store, on_log=_cancel_after(control, 7))
+    with pytest.raises(JobCancelled):
+        engine.run([("Test", str(inbox), set())], recursive=True, control=control)
+    assert len(_organized(inbox)) == 7
+    state = store.find()
+    assert state is not None
+    assert state.finished_dirs
+
+    # A fresh engine picks the job up from disk, as the CLI's --resume does.
+    result = OrganizerEngine(checkpoints=store).resume()
+    assert result is not None
+    assert len(_organized(inbox)) == 15
+    for sub in ("one", "two", "three"):
+        assert not any(name.endswith(".txt") for name in os.listdir(inbox / sub))
+    assert store.find() is None
+
+
+def test_resume_without_an_interrupted_job(tmp_path):
+    engine = OrganizerEngine(checkpoints=CheckpointStore(str(tmp_path / "checkpoints")))
+    assert engine.resume() is None
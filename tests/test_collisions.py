@@ -0,0 +1,42 @@
+import os
+
+from dedupe import collision_stem
+from engine import OrganizerEngine
+
+
+def _write(path, data: bytes) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+def _organize_with_collisions(folder, workers: int) -> dict[str, bytes]:
+    """Documents/r.txt already exists; r.txt and r (1).txt compete for r (1).txt."""
+    _write(os.path.join(folder, "Documents", "r.txt"), b"existing")
+    _write(os.path.join(folder, "r.txt"), b"r")
+    _write(os.path.join(folder, "r (1).txt"), b"r1")
+    for number in range(400):
+        _write(os.path.join(folder, f"pad{number}.txt"), b"pad")
+    OrganizerEngine(workers=workers).run([("Test", folder, set())])
+    documents = os.path.join(folder, "Documents")
+    result = {}
+    for name in os.listdir(documents):
+        if name.startswith("r"):
+            with open(os.path.join(documents, name), "rb") as f:
+                result[name] = f.read()
+    return result
+
+
+def test_collision_stem():
+    assert collision_stem("r.txt") == "r.txt"
+    assert collision_stem("r (1).txt") == "r.txt"
+    assert collision_stem("r (1) (12).txt") == "r.txt"
+    assert collision_stem("r(1).txt") == "r(1).txt"
+    assert collision_stem("notes (draft).txt") == "notes (draft).txt"
+
+
+def test_collision_names_do_not_depend_on_workers(tmp_path):
+    expected = _organize_with_collisions(str(tmp_path / "serial"), workers=1)
+    assert len(expected) == 3
+    for attempt in range(15):
+        assert _organize_with_collisions(str(tmp_path / f"parallel{attempt}"), workers=8) == expected
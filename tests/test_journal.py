@@ -0,0 +1,89 @@
+import os
+
+import pytest
+
+from engine import OrganizerEngine
+from journal import UndoJournal
+
+
+def _touch(path: str, data: bytes = b"x") -> str:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(data)
+    return path
+
+
+def _organize(engine: OrganizerEngine, folder: str) -> None:
+    engine.run([("Test", folder, set())])
+
+
+def _unavailable(folders):
+    raise OSError("disk full")
+
+
+@pytest.fixture
+def journal(tmp_path):
+    return UndoJournal(str(tmp_path / "journal"))
+
+
+def test_undo_replays_the_last_session(tmp_path, journal):
+    folder = tmp_path / "inbox"
+    _touch(str(folder / "a.txt"))
+    _touch(str(folder / "b.jpg"))
+    engine = OrganizerEngine(journal=journal)
+    _organize(engine, str(folder))
+    assert (folder / "Documents" / "a.txt").exists()
+    assert (folder / "Images" / "b.jpg").exists()
+
+    # A fresh engine finds the session on disk, as the CLI's --undo does.
+    assert OrganizerEngine(journal=journal).undo() == 2
+    assert (folder / "a.txt").exists() and (folder / "b.jpg").exists()
+    assert journal.find() is None
+
+
+def test_sessions_that_moved_nothing_are_not_kept(tmp_path, journal):
+    folder = tmp_path / "inbox"
+    _touch(str(folder / "a.txt"))
+    engine = OrganizerEngine(journal=journal)
+    _organize(engine, str(folder))
+    _organize(engine, str(folder))  # nothing left to move
+
+    assert len(journal.sessions()) == 1
+    assert engine.undo() == 1
+    assert (folder / "a.txt").exists()
+
+
+def test_undo_uses_the_in_memory_log_when_the_journal_failed(tmp_path, journal, monkeypatch):
+    folder = tmp_path / "inbox"
+    _touch(str(folder / "old.txt"))
+    engine = OrganizerEngine(journal=journal)
+    _organize(engine, str(folder))
+
+    _touch(str(folder / "new.jpg"))
+    monkeypatch.setattr(journal, "begin", _unavailable)
+    _organize(engine, str(folder))
+    monkeypatch.undo()
+
+    assert engine.can_undo()
+    assert engine.undo() == 1
+    assert (folder / "new.jpg").exists()
+    assert (folder / "Documents" / "old.txt").exists()
+
+    # The journaled run before it is next in line.
+    assert engine.undo() == 1
+    assert (folder / "old.txt").exists()
+    assert not engine.can_undo()
+
+
+def test_a_dry_run_keeps_the_in_memory_log(tmp_path, journal, monkeypatch):
+    folder = tmp_path / "inbox"
+    _touch(str(folder / "new.jpg"))
+    engine = OrganizerEngine(journal=journal)
+    monkeypatch.setattr(journal, "begin", _unavailable)
+    _organize(engine, str(folder))
+    monkeypatch.undo()
+    _touch(str(folder / "other.txt"))
+    engine.run([("Test", str(folder), set())], dry_run=True)
+
+    assert engine.undo() == 1
+    assert (folder / "new.jpg").exists()
@@ -0,0 +1,77 @@
+import json
+import os
+
+import pytest
+
+from engine import OrganizerEngine
+from journal import UndoJournal
+from plan import MovePlan, read_plan
+
+
+def _make_plan(tmp_path, names):
+    folder = tmp_path / "inbox"
+    folder.mkdir()
+    for name in names:
+        (folder / name).write_text(name)
+    plan_path = str(tmp_path / "plan.jsonl")
+    OrganizerEngine().run([("Test", str(folder), set())], dry_run=True, plan_path=plan_path)
+    return folder, plan_path
+
+
+def _replace_line(path: str, number: int, text: str) -> None:
+    with open(path, encoding="utf-8") as f:
+        lines = f.read().splitlines()
+    lines[number] = text
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+
+
+def test_reserve_only_refuses_a_destination_already_claimed(tmp_path):
+    plan = MovePlan()
+    assert plan.reserve(str(tmp_path / "Documents" / "a.txt"))
+    assert plan.reserve(str(tmp_path / "Documents" / "b.txt"))
+    assert not plan.reserve(str(tmp_path / "Documents" / "a.txt"))
+
+
+def test_a_saved_plan_is_read_back_and_applied(tmp_path):
+    folder, plan_path = _make_plan(tmp_path, ["a.txt", "b.jpg", "c.mp3"])
+    assert not (folder / "Documents").exists()
+
+    with read_plan(plan_path) as plan:
+        items = list(plan)
+        assert plan.header["files"] == 3
+        assert plan.fraction == 1.0
+    assert sorted(item.category for item in items) == ["Audio", "Documents", "Images"]
+
+    engine = OrganizerEngine(journal=UndoJournal(str(tmp_path / "journal")))
+    result = engine.apply_plan(plan_path)
+    assert (result.queued, result.moved) == (3, 3)
+    assert (folder / "Images" / "b.jpg").exists()
+    assert engine.undo() == 3
+    assert sorted(os.listdir(folder)) == ["Audio", "Documents", "Images", "a.txt", "b.jpg", "c.mp3"]
+
+
+@pytest.mark.parametrize("damage", ["not json", "42", '"text"', "[1, 2]"])
+def test_a_damaged_plan_stops_at_the_damaged_record(tmp_path, damage):
+    folder, plan_path = _make_plan(tmp_path, ["a.txt", "b.txt", "c.txt"])
+    _replace_line(plan_path, 2, damage)
+    logs = []
+    engine = OrganizerEngine(on_log=lambda message, level: logs.append((level, message)))
+
+    result = engine.apply_plan(plan_path)
+
+    assert (result.queued, result.moved) == (1, 1)
+    assert any(level == "ERROR" and message.startswith("Stopped applying") for level, message in logs)
+    assert len(os.listdir(folder / "Documents")) == 1
+
+
+def test_a_file_that_is_not_a_plan_is_rejected(tmp_path):
+    path = tmp_path / "other.jsonl"
+    path.write_text(json.dumps({"plan": 99}) + "\n")
+    with pytest.raises(ValueError):
+        read_plan(str(path))
+
+    logs = []
+    result = OrganizerEngine(on_log=lambda message, level: logs.append((level, message))).apply_plan(str(path))
+    assert result.queued == 0
+    assert logs[0][0] == "ERROR"
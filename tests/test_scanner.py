@@ -0,0 +1,33 @@
+from engine import OrganizerEngine
+from scanner import is_dynamic_folder
+
+
+def test_only_folders_holding_their_own_extension_count_as_dynamic(tmp_path):
+    made = tmp_path / "XYZ_Files"
+    made.mkdir()
+    (made / "a.xyz").write_text("x")
+    own = tmp_path / "2024_Files"
+    own.mkdir()
+    (own / "taxes.pdf").write_text("x")
+    nested = tmp_path / "Q3_Files"
+    (nested / "drafts").mkdir(parents=True)
+    (tmp_path / "Client_Files").mkdir()
+
+    assert is_dynamic_folder(str(made))
+    assert not is_dynamic_folder(str(own))
+    assert not is_dynamic_folder(str(nested))
+    assert not is_dynamic_folder(str(tmp_path / "Client_Files"))
+
+
+def test_recursive_run_skips_only_the_organizers_own_folders(tmp_path):
+    for relative in ("XYZ_Files/a.xyz", "2024_Files/taxes.pdf", "Client_Files/brief.txt", "Documents/old.txt"):
+        path = tmp_path / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("x")
+
+    OrganizerEngine().run([("Test", str(tmp_path), set())], recursive=True)
+
+    assert (tmp_path / "XYZ_Files" / "a.xyz").exists()
+    assert (tmp_path / "Documents" / "taxes.pdf").exists()
+    assert (tmp_path / "Documents" / "brief.txt").exists()
+    assert (tmp_path / "Documents" / "old.txt").exists()
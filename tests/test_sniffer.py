@@ -0,0 +1,39 @@
+from engine import OrganizerEngine
+
+PNG = b"\x89PNG\r\n\x1a\n" + b"\x00" * 32
+PDF = b"%PDF-1.7\n" + b"\x00" * 32
+OLE = b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1" + b"\x00" * 32
+
+
+def _organize(tmp_path, files: dict[str, bytes], **options) -> set[str]:
+    folder = tmp_path / "inbox"
+    folder.mkdir()
+    for name, data in files.items():
+        (folder / name).write_bytes(data)
+    OrganizerEngine(**options).run([("Test", str(folder), set())])
+    return {str(path.relative_to(folder)) for path in folder.rglob("*") if path.is_file()}
+
+
+def test_extensionless_and_unknown_files_are_sorted_by_content(tmp_path):
+    placed = _organize(tmp_path, {"scan": PDF, "photo.dat1": PNG}, sniff_content=True)
+    assert placed == {"Documents/scan", "Images/photo.dat1"}
+
+
+def test_a_confident_signature_overrules_the_extension(tmp_path):
+    placed = _organize(tmp_path, {"picture.pdf": PNG, "report.jpg": PDF}, sniff_content=True)
+    assert placed == {"Images/picture.pdf", "Documents/report.jpg"}
+
+
+def test_ambiguous_signatures_and_custom_rules_keep_the_extension(tmp_path):
+    placed = _organize(
+        tmp_path,
+        {"setup.msi": OLE, "notes.txt": b"#!/bin/sh\n", "shot.raw": PNG},
+        custom_rules={".raw": "Camera"},
+        sniff_content=True,
+    )
+    assert placed == {"System_Apps/setup.msi", "Documents/notes.txt", "Camera/shot.raw"}
+
+
+def test_without_sniffing_the_extension_decides(tmp_path):
+    placed = _organize(tmp_path, {"picture.pdf": PNG})
+    assert placed == {"Documents/picture.pdf"}
@@ -0,0 +1,47 @@
+import json
+import os
+
+import pytest
+
+from engine import OrganizerEngine
+from jobs import JobCancelled, JobControl
+from stats import StatsIndex
+
+
+def test_a_cancelled_run_is_still_recorded(tmp_path):
+    folder = tmp_path / "inbox"
+    folder.mkdir()
+    for number in range(5):
+        (folder / f"doc{number}.txt").write_text("x")
+    stats = StatsIndex(str(tmp_path / "stats.sqlite3"))
+    metrics_path = str(tmp_path / "metrics.json")
+    control = JobControl()
+
+    def on_log(message, level):
+        if message.startswith("Moved") and sum(1 for _ in (folder / "Documents").iterdir()) == 2:
+            control.cancel()
+
+    engine = OrganizerEngine(stats=stats, metrics_path=metrics_path, on_log=on_log)
+    with pytest.raises(JobCancelled):
+        engine.run([("Test", str(folder), set())], control=control)
+
+    run = stats.runs()[0]
+    assert run["status"] == "cancelled"
+    assert run["finished"] is not None
+    assert run["files_moved"] == 2
+    assert stats.category_totals()[0]["files"] == 2
+    with open(metrics_path, encoding="utf-8") as f:
+        assert json.load(f)["counters"]["files_moved"] == 2
+    stats.close()
+
+
+def test_a_finished_run_is_marked_done(tmp_path):
+    folder = tmp_path / "inbox"
+    folder.mkdir()
+    (folder / "a.txt").write_text("x")
+    stats = StatsIndex(str(tmp_path / "stats.sqlite3"))
+    OrganizerEngine(stats=stats).run([("Test", str(folder), set())])
+
+    assert stats.runs()[0]["status"] == "done"
+    assert os.path.exists(folder / "Documents" / "a.txt")
+    stats.close()
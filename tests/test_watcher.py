@@ -0,0 +1,70 @@
+import threading
+import time
+
+from engine import OrganizerEngine
+from journal import UndoJournal
+from watcher import FolderWatcher
+
+
+def _wait_for(condition, timeout: float = 10.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.05)
+    return False
+
+
+def _watch(engine, folder, logs):
+    watcher = FolderWatcher(
+        engine,
+        [("Test", str(folder), set())],
+        debounce=0.1,
+        poll_interval=0.1,
+        on_log=lambda message, level: logs.append((level, message)),
+    )
+    thread = threading.Thread(target=watcher.run, daemon=True)
+    thread.start()
+    return watcher, thread
+
+
+def test_watch_moves_new_files_into_one_undo_session(tmp_path):
+    folder = tmp_path / "inbox"
+    folder.mkdir()
+    journal = UndoJournal(str(tmp_path / "journal"))
+    engine = OrganizerEngine(journal=journal)
+    logs = []
+    watcher, thread = _watch(engine, folder, logs)
+    (folder / "a.txt").write_text("x")
+    (folder / "b.jpg").write_text("x")
+    moved = _wait_for(lambda: (folder / "Images" / "b.jpg").exists() and (folder / "Documents" / "a.txt").exists())
+    watcher.stop()
+    thread.join(5)
+
+    assert moved and not thread.is_alive()
+    assert [session.moved for session in journal.sessions()] == [2]
+    assert engine.undo() == 2
+    assert (folder / "a.txt").exists() and (folder / "b.jpg").exists()
+
+
+def test_watch_keeps_going_without_a_journal(tmp_path, monkeypatch):
+    folder = tmp_path / "inbox"
+    folder.mkdir()
+    journal = UndoJournal(str(tmp_path / "journal"))
+
+    def unavailable(folders):
+        raise OSError("read-only")
+
+    monkeypatch.setattr(journal, "begin", unavailable)
+    engine = OrganizerEngine(journal=journal)
+    logs = []
+    watcher, thread = _watch(engine, folder, logs)
+    (folder / "a.txt").write_text("x")
+    moved = _wait_for(lambda: (folder / "Documents" / "a.txt").exists())
+    watcher.stop()
+    thread.join(5)
+
+    assert moved
+    assert any(level == "ERROR" and "Undo journal unavailable" in message for level, message in logs)
+    assert engine.undo() == 1
+    assert (folder / "a.txt").exists()